@@ -0,0 +1,125 @@
+from fastapi import APIRouter, Request, Form, Depends, File, UploadFile
+from fastapi.responses import HTMLResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+import app.db.database as database
+import app.api.ui as ui
+import app.core.services as services
+import app.core.rate_limit as rate_limit
+
+router = APIRouter()
+
+async def get_db():
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+def get_current_user(request: Request):
+    # Resolved once per request by add_user_to_request.
+    return request.state.auth.username
+
+@router.get("/", response_class=HTMLResponse)
+async def home(request: Request, current_user: str = Depends(get_current_user)):
+    return await ui.home(request, current_user)
+
+@router.get("/login", response_class=HTMLResponse)
+async def login_get(request: Request):
+    return await ui.login_get(request)
+
+@router.post("/login", dependencies=[Depends(rate_limit.login)])
+async def login_post(request: Request, username: str = Form(...), password: str = Form(...), db: AsyncSession = Depends(get_db)):
+    return await ui.login_post(request, username, password, db)
+
+@router.get("/signup", response_class=HTMLResponse)
+async def signup_get(request: Request):
+    return await ui.signup_get(request)
+
+@router.post("/signup", dependencies=[Depends(rate_limit.signup)])
+async def signup_post(request: Request, username: str = Form(...), email: str = Form(...), password: str = Form(...), confirm_password: str = Form(...), db: AsyncSession = Depends(get_db)):
+    return await ui.signup_post(request, username, email, password, confirm_password, db)
+
+@router.get("/logout")
+async def logout(request: Request):
+    return await ui.logout(request)
+
+@router.get("/log", response_class=HTMLResponse)
+async def log_ticket_get(request: Request, current_user: str = Depends(get_current_user)):
+    return await ui.log_ticket_get(request, current_user)
+
+@router.post("/log", dependencies=[Depends(rate_limit.tickets)])
+async def log_ticket_post(request: Request, name: str = Form(...), department: str = Form(...), category: str = Form(...), issue: str = Form(...), current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.log_ticket_post(request, name, None, department, category, issue, current_user, db)
+
+@router.get("/my-tickets", response_class=HTMLResponse)
+async def staff_tickets(request: Request, query: services.TicketQuery = Depends(ui.get_ticket_query), current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.staff_tickets(request, query, current_user, db)
+
+@router.post("/my-tickets/edit")
+async def edit_ticket(request: Request, ticket_id: int = Form(...), name: str = Form(...), department: str = Form(...), category: str = Form(...), issue: str = Form(...), current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.edit_ticket(request, ticket_id, name, department, category, issue, current_user, db)
+
+@router.get("/my-tickets/delete/{ticket_id}")
+async def delete_ticket(request: Request, ticket_id: int, current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.delete_ticket(request, ticket_id, current_user, db)
+
+@router.get("/it", response_class=HTMLResponse)
+async def it_dashboard_get(request: Request, query: services.TicketQuery = Depends(ui.get_ticket_query), current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.it_dashboard_get(request, query, current_user, db)
+
+@router.post("/it")
+async def it_dashboard_post(request: Request, ticket_id: int = Form(...), status: str = Form(...), priority: str = Form(...), current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.it_dashboard_post(request, ticket_id, status, priority, current_user, db)
+
+@router.post("/it/bulk")
+async def bulk_update_tickets(request: Request, ticket_ids: List[int] = Form([]), status: str = Form(""), priority: str = Form(""), apply_to: str = Form("selected"), query: services.TicketQuery = Depends(ui.get_ticket_query), current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.bulk_update_tickets(request, ticket_ids, status, priority, apply_to, query, current_user, db)
+
+@router.get("/it/events")
+async def it_events(request: Request, current_user: str = Depends(get_current_user)):
+    return await ui.it_events(request, current_user)
+
+@router.get("/it/import", response_class=HTMLResponse)
+async def import_tickets_get(request: Request, current_user: str = Depends(get_current_user)):
+    return await ui.import_tickets_get(request, current_user)
+
+@router.post("/it/import", response_class=HTMLResponse, dependencies=[Depends(rate_limit.tickets)])
+async def import_tickets_post(request: Request, file: UploadFile = File(...), format: str = Form(""), current_user: str = Depends(get_current_user)):
+    return await ui.import_tickets_post(request, file, format, current_user)
+
+@router.get("/search", response_class=HTMLResponse)
+async def search(request: Request, q: str = "", current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.search(request, q, current_user, db)
+
+@router.get("/profile", response_class=HTMLResponse)
+async def profile(request: Request, current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.profile(request, current_user, db)
+
+@router.post("/change-password")
+async def change_password(request: Request, current_password: str = Form(...), new_password: str = Form(...), confirm_password: str = Form(...), current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.change_password(request, current_password, new_password, confirm_password, current_user, db)
+
+@router.get("/delete-account")
+async def delete_account(request: Request, current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.delete_account(request, current_user, db)
+
+@router.get("/manager", response_class=HTMLResponse)
+async def manager_dashboard(request: Request, period: str = "month", current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.manager_dashboard(request, period, current_user, db)
+
+@router.get("/manager/download-report", dependencies=[Depends(rate_limit.export)])
+async def download_manager_report(request: Request, format: str = "text", status: Optional[str] = None, date_from: Optional[date] = None, date_to: Optional[date] = None, current_user: str = Depends(get_current_user)):
+    # No request session: the export streams from its own.
+    from app.core.export import ExportQuery
+    return await ui.download_manager_report(request, format, ExportQuery(status, date_from, date_to), current_user)
+
+@router.get("/metrics")
+async def metrics_endpoint(request: Request):
+    return await ui.metrics_endpoint(request)
+
+@router.get("/manage-users", response_class=HTMLResponse)
+async def manage_users_get(request: Request, current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.manage_users_get(request, current_user, db)
+
+@router.post("/manage-users/update-role")
+async def update_user_role(request: Request, user_id: int = Form(...), role: str = Form(...), current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await ui.update_user_role(request, user_id, role, current_user, db)
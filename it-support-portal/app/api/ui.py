@@ -1,25 +1,45 @@
-from fastapi import Request, Form, Depends, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import Request, Form, Depends, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from markupsafe import Markup
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+import secrets
+from typing import Optional
+import app.core.assets as assets
 import app.core.auth as auth
+import app.core.auth_context as auth_context
+import app.core.rollups as rollups
+import app.core.sla as sla
+import app.core.versioning as versioning
 import app.db.database as database
-import app.db.models as models
+from app.core.stats import AsyncStatsService, STATUSES, PRIORITIES
+from app.core.services import AsyncUserService, AsyncTicketService, TicketQuery
+from app.core.search import AsyncSearchService
+from app.core.duplicates import detector
+from app.core.render_cache import RenderCache
+from app.core.conditional import page_validators, is_not_modified
+from app.core.events import hub
+from app.core import metrics
+from app.core.rate_limit import store as rate_limit_store
+from app.core.write_queue import writer
+from app.core.config import config
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 templates = Jinja2Templates(directory="templates")
+templates.env.template_class = metrics.TimedTemplate
+templates.env.globals["asset_urls"] = assets.manifest.urls
+templates.env.filters["duration"] = sla.format_duration
+render_cache = RenderCache(max_bytes=config.RENDER_CACHE_MAX_BYTES)
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+BUSY_MESSAGE = "The server is busy, please try again in a moment"
+
+DEPARTMENTS = ["Sales", "Marketing", "Engineering", "HR", "Finance", "Operations", "Other"]
+CATEGORIES = ["Hardware", "Software", "Network", "Email", "Access", "Printer", "Other"]
 
-def get_current_user(token: str = None):
-    if not token:
-        return None
-    return auth.verify_token(token)
+def get_ticket_query(status: Optional[str] = None, priority: Optional[str] = None, department: Optional[str] = None, category: Optional[str] = None, owner: Optional[str] = None, sort: str = "created_at", order: str = "desc", cursor: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), archived: bool = False):
+    return TicketQuery(status, priority, department, category, owner, sort, order, cursor, limit, archived=archived)
 
 async def home(request: Request, current_user: str = None):
     if current_user:
@@ -29,13 +49,16 @@ async def home(request: Request, current_user: str = None):
 async def login_get(request: Request):
     return templates.TemplateResponse("login.html", {"request": request})
 
-async def login_post(request: Request, username: str, password: str, db: Session):
+async def login_post(request: Request, username: str, password: str, db: AsyncSession):
     username = username.replace(" ", "")
-    user = db.query(models.User).filter(
-        (models.User.username == username) | (models.User.email == username)
-    ).first()
+    user = await AsyncUserService.get_user_by_login(db, username)
+    
+    try:
+        valid = user is not None and await auth.verify_password_async(password, user.password)
+    except auth.HashPoolBusy:
+        return templates.TemplateResponse("login.html", {"request": request, "error": BUSY_MESSAGE, "username": username}, status_code=503)
     
-    if user and auth.verify_password(password, user.password):
+    if valid:
         access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = auth.create_access_token(
             data={"sub": user.username}, expires_delta=access_token_expires
@@ -49,7 +72,7 @@ async def login_post(request: Request, username: str, password: str, db: Session
 async def signup_get(request: Request):
     return templates.TemplateResponse("signup.html", {"request": request})
 
-async def signup_post(request: Request, username: str, email: str, password: str, confirm_password: str, db: Session):
+async def signup_post(request: Request, username: str, email: str, password: str, confirm_password: str, db: AsyncSession):
     username = username.strip()
     password = password.strip()
     
@@ -65,14 +88,15 @@ async def signup_post(request: Request, username: str, email: str, password: str
     if len(password) < 6 or not any(char.isdigit() for char in password):
         return templates.TemplateResponse("signup.html", {"request": request, "error": "Password must be at least 6 characters with one number"})
     
-    if db.query(models.User).filter(models.User.username == username).first():
+    if await AsyncUserService.get_user_by_username(db, username):
         return templates.TemplateResponse("signup.html", {"request": request, "error": "Username already exists"})
     
-    hashed_password = auth.get_password_hash(password)
     role = "it" if username.lower() == "it" else ("manager" if username.lower() == "manager" else "staff")
-    user = models.User(username=username, email=email, password=hashed_password, role=role)
-    db.add(user)
-    db.commit()
+    try:
+        await AsyncUserService.create_user(db, username, email, password, role)
+    except auth.HashPoolBusy:
+        return templates.TemplateResponse("signup.html", {"request": request, "error": BUSY_MESSAGE}, status_code=503)
+    auth_context.invalidate(username)
     
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
@@ -92,90 +116,257 @@ async def log_ticket_get(request: Request, current_user: str):
         return RedirectResponse(url="/login", status_code=302)
     return templates.TemplateResponse("log_ticket.html", {"request": request})
 
-async def log_ticket_post(request: Request, name: str, email: str, department: str, category: str, issue: str, current_user: str, db: Session):
+async def log_ticket_post(request: Request, name: str, email: str, department: str, category: str, issue: str, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.query(models.User).filter(models.User.username == current_user).first()
-    user_email = user.email if user else ""
+    user_email = request.state.auth.email or ""
     
     name = name.strip()
     issue = issue.strip()
     
     if name and department and category and issue:
-        ticket = models.Ticket(
-            name=name,
-            email=user_email,
-            department=department,
-            category=category,
-            issue=issue,
-            status="Open",
-            priority="Medium"
-        )
-        db.add(ticket)
-        db.commit()
+        duplicate = await detector.find(db, department, category, issue)
+        ticket = await AsyncTicketService.create_ticket(db, name, issue, user_email, department, category,
+                                                        owner_id=request.state.auth.user_id,
+                                                        duplicate_of=duplicate.ticket_id if duplicate else None)
+        detector.add(ticket)
+        publish_ticket("created", ticket)
     
     return RedirectResponse(url="/my-tickets", status_code=302)
 
-async def staff_tickets(request: Request, current_user: str, db: Session):
+async def render_fragment(name: str, version: int, key, build):
+    """Render templates/fragments/<name>.html once per ticket data version.
+
+    ``key`` holds whatever else the fragment depends on (filters, page, owner);
+    ``build`` is only awaited on a miss and returns the template context.
+    """
+    cache_key = (name, version, key)
+    html = render_cache.get(cache_key)
+    if html is None:
+        html = templates.get_template(f"fragments/{name}.html").render(await build())
+        render_cache.set(cache_key, html)
+    return Markup(html)
+
+def publish_ticket(event: str, ticket):
+    """Push a ticket change to open IT dashboards with the row pre-rendered."""
+    if ticket is None or not hub.subscriber_count:
+        return
+    hub.publish(event, {
+        "id": ticket.id,
+        "status": ticket.status,
+        "html": templates.get_template("fragments/it_ticket_row.html").render(t=ticket)
+    })
+
+async def publish_tickets(db: AsyncSession, ticket_ids: list):
+    if not ticket_ids or not hub.subscriber_count:
+        return
+    if len(ticket_ids) > config.EVENT_BULK_ROW_LIMIT:
+        hub.publish("resync", {"reason": "bulk", "count": len(ticket_ids)})
+        return
+    for ticket in await AsyncTicketService.get_tickets(db, ticket_ids):
+        publish_ticket("updated", ticket)
+
+def ticket_owner_scope(request: Request):
+    # IT staff may change any ticket; everyone else only their own.
+    context = request.state.auth
+    return None if context.role == "it" else context.user_id
+
+def ticket_filter_context(request: Request, query: TicketQuery):
+    return {
+        "request": request,
+        "query": query,
+        "base_path": request.url.path,
+        "statuses": STATUSES,
+        "priorities": PRIORITIES,
+        "departments": DEPARTMENTS,
+        "categories": CATEGORIES
+    }
+
+def ticket_list_context(request: Request, query: TicketQuery, page):
+    context = ticket_filter_context(request, query)
+    context.update({"page": page, "tickets": page.items})
+    return context
+
+async def staff_tickets(request: Request, query: TicketQuery, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    tickets = db.query(models.Ticket).all()
-    return templates.TemplateResponse("staff_tickets.html", {"request": request, "tickets": tickets})
+    query.owner_id = request.state.auth.user_id
+    
+    async def build():
+        page = await AsyncTicketService.list_tickets(db, query)
+        return ticket_list_context(request, query, page)
+    
+    version, updated_at = await versioning.current_version(db)
+    validators = page_validators(request, version, updated_at)
+    if is_not_modified(request, validators):
+        return Response(status_code=304, headers=validators)
+    
+    key = (query.owner_id, request.url.path, query.params())
+    tickets = await render_fragment("staff_tickets", version, key, build)
+    return templates.TemplateResponse("staff_tickets.html", {"request": request, "tickets": tickets}, headers=validators)
 
-async def it_dashboard_get(request: Request, current_user: str, db: Session):
+async def it_dashboard_get(request: Request, query: TicketQuery, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    tickets = db.query(models.Ticket).all()
-    open_count = len([t for t in tickets if t.status == "Open"])
-    closed_count = len([t for t in tickets if t.status == "Closed"])
-    
-    return templates.TemplateResponse("it_dashboard.html", {
-        "request": request, 
-        "tickets": tickets, 
-        "open_count": open_count, 
-        "closed_count": closed_count
+    async def build_stats():
+        stats = await AsyncStatsService.get_ticket_stats(db)
+        return {
+            "total_count": stats.total,
+            "open_count": stats.count(status="Open"), 
+            "closed_count": stats.count(status="Closed")
+        }
+    
+    async def build_tickets():
+        page = await AsyncTicketService.list_tickets(db, query)
+        active_tickets, closed_tickets = [], []
+        for t in page.items:
+            (closed_tickets if t.status == "Closed" else active_tickets).append(t)
+        context = ticket_list_context(request, query, page)
+        context.update({"active_tickets": active_tickets, "closed_tickets": closed_tickets})
+        return context
+    
+    version, updated_at = await versioning.current_version(db)
+    validators = page_validators(request, version, updated_at)
+    if is_not_modified(request, validators):
+        return Response(status_code=304, headers=validators)
+    
+    context = ticket_filter_context(request, query)
+    context.update({
+        "show_owner_filter": True,
+        "stats": await render_fragment("it_stats", version, None, build_stats),
+        "tickets": await render_fragment("it_tickets", version, query.params(), build_tickets)
     })
+    return templates.TemplateResponse("it_dashboard.html", context, headers=validators)
 
-async def it_dashboard_post(request: Request, ticket_id: int, status: str, priority: str, current_user: str, db: Session):
+async def it_dashboard_post(request: Request, ticket_id: int, status: str, priority: str, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    ticket = db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
-    if ticket:
-        ticket.status = status
-        ticket.priority = priority
-        db.commit()
+    ticket = await AsyncTicketService.update_ticket(db, ticket_id, status, priority, actor_id=request.state.auth.user_id)
+    publish_ticket("updated", ticket)
     
     return RedirectResponse(url="/it", status_code=302)
 
-async def profile(request: Request, current_user: str, db: Session):
+async def it_events(request: Request, current_user: str):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.query(models.User).filter(models.User.username == current_user).first()
-    tickets = db.query(models.Ticket).all()
-    user_tickets = [t for t in tickets if t.name.lower() == current_user.lower()]
-    open_tickets = len([t for t in user_tickets if t.status == "Open"])
-    closed_tickets = len([t for t in user_tickets if t.status == "Closed"])
+    if request.state.auth.role != "it":
+        return RedirectResponse(url="/log", status_code=302)
+    
+    async def stream():
+        subscriber = hub.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                message = await subscriber.next(config.EVENT_HEARTBEAT_SECONDS)
+                # A comment line keeps proxies from closing an idle stream.
+                yield message or ": keep-alive\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Compression middleware buffers its output, which would hold events back.
+        "Content-Encoding": "identity",
+        "X-Accel-Buffering": "no"
+    })
+
+async def import_tickets_get(request: Request, current_user: str):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    if request.state.auth.role != "it":
+        return RedirectResponse(url="/log", status_code=302)
+    
+    from app.core.importer import IMPORT_FORMATS
+    return templates.TemplateResponse("import_tickets.html", {"request": request, "formats": IMPORT_FORMATS})
+
+async def import_tickets_post(request: Request, file: UploadFile, fmt: str, current_user: str):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    if request.state.auth.role != "it":
+        return RedirectResponse(url="/log", status_code=302)
+    
+    # Import and export are rare; their modules load on first use.
+    from app.core.importer import TicketImporter, IMPORT_FORMATS, detect_format
+    fmt = fmt or detect_format(file.filename)
+    if fmt not in IMPORT_FORMATS:
+        return templates.TemplateResponse("import_tickets.html", {
+            "request": request, 
+            "formats": IMPORT_FORMATS, 
+            "error": "Choose a format or upload a .csv or .ndjson file"
+        }, status_code=400)
+    
+    # Parsing and batched inserts are CPU and disk bound, so they run on the
+    # sync engine in a worker thread rather than on the event loop.
+    report = await run_in_threadpool(TicketImporter(database.engine).import_file, file.file, fmt)
+    if report.imported:
+        hub.publish("resync", {"reason": "import", "count": report.imported})
+    return templates.TemplateResponse("import_tickets.html", {"request": request, "formats": IMPORT_FORMATS, "report": report})
+
+async def search(request: Request, q: str, current_user: str, db: AsyncSession):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    results = await AsyncSearchService.search(db, q, owner_id=ticket_owner_scope(request))
+    return templates.TemplateResponse("search.html", {"request": request, "q": q, "results": results})
+
+async def bulk_update_tickets(request: Request, ticket_ids: list, status: str, priority: str, apply_to: str, query: TicketQuery, current_user: str, db: AsyncSession):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    if request.state.auth.role != "it":
+        return RedirectResponse(url="/log", status_code=302)
+    
+    try:
+        if apply_to == "filter":
+            results = await AsyncTicketService.bulk_update(db, status, priority, query=query,
+                                                           actor_id=request.state.auth.user_id)
+        else:
+            results = await AsyncTicketService.bulk_update(db, status, priority, ticket_ids=ticket_ids,
+                                                           actor_id=request.state.auth.user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    updated_ids = [r["id"] for r in results if r["result"] == "updated"]
+    await publish_tickets(db, updated_ids)
+    updated = len(updated_ids)
+    return RedirectResponse(
+        url=query.url("/it", cursor=None, bulk_updated=updated, bulk_missing=len(results) - updated),
+        status_code=302
+    )
+
+async def profile(request: Request, current_user: str, db: AsyncSession):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    stats = await AsyncTicketService.get_ticket_stats(db, owner_id=request.state.auth.user_id)
     
     return templates.TemplateResponse("profile.html", {
         "request": request,
-        "user_tickets": user_tickets,
-        "open_tickets": open_tickets,
-        "closed_tickets": closed_tickets,
-        "user_role": user.role if user else "staff"
+        "total_tickets": stats["total"],
+        "open_tickets": stats["open"],
+        "closed_tickets": stats["closed"],
+        "user_role": request.state.auth.role or "staff"
     })
 
-async def change_password(request: Request, current_password: str, new_password: str, confirm_password: str, current_user: str, db: Session):
+async def change_password(request: Request, current_password: str, new_password: str, confirm_password: str, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.query(models.User).filter(models.User.username == current_user).first()
+    user = await AsyncUserService.get_user_by_username(db, current_user)
+    
+    try:
+        valid = user is not None and await auth.verify_password_async(current_password, user.password)
+    except auth.HashPoolBusy:
+        return templates.TemplateResponse("profile.html", {"request": request, "error": BUSY_MESSAGE}, status_code=503)
     
-    if not user or not auth.verify_password(current_password, user.password):
+    if not valid:
         return templates.TemplateResponse("profile.html", {"request": request, "error": "Current password is incorrect"})
     
     if new_password != confirm_password:
@@ -184,145 +375,157 @@ async def change_password(request: Request, current_password: str, new_password:
     if len(new_password) < 6 or not any(char.isdigit() for char in new_password):
         return templates.TemplateResponse("profile.html", {"request": request, "error": "Password must be at least 6 characters with one number"})
     
-    user.password = auth.get_password_hash(new_password)
-    db.commit()
+    try:
+        await AsyncUserService.update_password(db, user, new_password)
+    except auth.HashPoolBusy:
+        return templates.TemplateResponse("profile.html", {"request": request, "error": BUSY_MESSAGE}, status_code=503)
     
     return RedirectResponse(url="/profile", status_code=302)
 
-async def delete_account(request: Request, current_user: str, db: Session):
+async def delete_account(request: Request, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.query(models.User).filter(models.User.username == current_user).first()
-    if user:
-        db.delete(user)
-        db.commit()
+    await AsyncUserService.delete_user(db, current_user)
+    auth_context.invalidate(current_user)
     
     response = RedirectResponse(url="/login", status_code=302)
     response.delete_cookie(key="access_token")
     return response
 
-async def manager_dashboard(request: Request, current_user: str, db: Session):
+async def manager_dashboard(request: Request, period: str, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.query(models.User).filter(models.User.username == current_user).first()
-    if not user or user.role != "manager":
+    if request.state.auth.role != "manager":
         return RedirectResponse(url="/log", status_code=302)
     
-    tickets = db.query(models.Ticket).all()
-    
-    stats = {
-        "total_tickets": len(tickets),
-        "open_tickets": len([t for t in tickets if t.status == "Open"]),
-        "in_progress_tickets": len([t for t in tickets if t.status == "In Progress"]),
-        "closed_tickets": len([t for t in tickets if t.status == "Closed"]),
-        "low_priority": len([t for t in tickets if t.priority == "Low"]),
-        "medium_priority": len([t for t in tickets if t.priority == "Medium"]),
-        "high_priority": len([t for t in tickets if t.priority == "High"])
-    }
-    
-    return templates.TemplateResponse("manager_dashboard.html", {"request": request, **stats})
+    if period not in rollups.PERIODS:
+        period = rollups.DEFAULT_PERIOD
+    
+    async def build():
+        stats = await AsyncStatsService.get_ticket_stats(db)
+        context = stats.summary()
+        context["trend"] = await rollups.AsyncTrendService.get_trend(db, period)
+        context["periods"] = list(rollups.PERIODS)
+        by_priority = (await sla.AsyncSlaService.get_summary(db)).by_priority()
+        context["close_times"] = [(priority, by_priority[priority]) for priority in reversed(PRIORITIES) if priority in by_priority]
+        return context
+    
+    # The trend window moves on every hour even when no ticket changes, so
+    # the current hour is part of both the ETag and the cache key.
+    hour = rollups.truncate(datetime.utcnow(), "hour")
+    version, updated_at = await versioning.current_version(db)
+    validators = page_validators(request, f"{version}.{hour:%Y%m%d%H}", max(updated_at, hour) if updated_at else hour)
+    if is_not_modified(request, validators):
+        return Response(status_code=304, headers=validators)
+    
+    dashboard = await render_fragment("manager_dashboard", version, (period, hour), build)
+    return templates.TemplateResponse("manager_dashboard.html", {"request": request, "dashboard": dashboard}, headers=validators)
 
-async def download_manager_report(request: Request, current_user: str, db: Session):
+async def download_manager_report(request: Request, fmt: str, query, current_user: str):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.query(models.User).filter(models.User.username == current_user).first()
-    if not user or user.role != "manager":
+    if request.state.auth.role != "manager":
         return RedirectResponse(url="/log", status_code=302)
     
-    tickets = db.query(models.Ticket).all()
-    
-    from fastapi.responses import StreamingResponse
-    import io
-    from datetime import datetime
-    
-    report = io.StringIO()
-    report.write("IT Support Portal - Ticket Summary Report\n")
-    report.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    report.write("="*60 + "\n\n")
-    
-    report.write(f"Total Tickets: {len(tickets)}\n")
-    report.write(f"Open: {len([t for t in tickets if t.status == 'Open'])}\n")
-    report.write(f"In Progress: {len([t for t in tickets if t.status == 'In Progress'])}\n")
-    report.write(f"Closed: {len([t for t in tickets if t.status == 'Closed'])}\n\n")
-    
-    report.write(f"Priority Breakdown:\n")
-    report.write(f"High: {len([t for t in tickets if t.priority == 'High'])}\n")
-    report.write(f"Medium: {len([t for t in tickets if t.priority == 'Medium'])}\n")
-    report.write(f"Low: {len([t for t in tickets if t.priority == 'Low'])}\n\n")
-    
-    report.write("="*60 + "\n")
-    report.write("Ticket Details:\n")
-    report.write("="*60 + "\n\n")
-    
-    for ticket in tickets:
-        report.write(f"Ticket #{ticket.id}\n")
-        report.write(f"Name: {ticket.name}\n")
-        report.write(f"Email: {ticket.email}\n")
-        report.write(f"Department: {ticket.department}\n")
-        report.write(f"Category: {ticket.category}\n")
-        report.write(f"Status: {ticket.status}\n")
-        report.write(f"Priority: {ticket.priority}\n")
-        report.write(f"Issue: {ticket.issue}\n")
-        report.write("-"*60 + "\n\n")
-    
-    report.seek(0)
+    from app.core.export import ExportService, EXPORT_FORMATS
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}'")
+    
     return StreamingResponse(
-        io.BytesIO(report.getvalue().encode()),
-        media_type="text/plain",
-        headers={"Content-Disposition": f"attachment; filename=ticket_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"}
+        ExportService.stream(fmt, query),
+        media_type=EXPORT_FORMATS[fmt][0],
+        headers={"Content-Disposition": f"attachment; filename={ExportService.filename(fmt)}"}
     )
 
 
-async def edit_ticket(request: Request, ticket_id: int, name: str, department: str, category: str, issue: str, current_user: str, db: Session):
+async def edit_ticket(request: Request, ticket_id: int, name: str, department: str, category: str, issue: str, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    ticket = db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
-    if ticket:
-        ticket.name = name.strip()
-        ticket.department = department
-        ticket.category = category
-        ticket.issue = issue.strip()
-        db.commit()
+    ticket = await AsyncTicketService.edit_ticket(db, ticket_id, name.strip(), department, category, issue.strip(),
+                                                  owner_id=ticket_owner_scope(request), actor_id=request.state.auth.user_id)
+    detector.add(ticket)
+    publish_ticket("updated", ticket)
     
     return RedirectResponse(url="/my-tickets", status_code=302)
 
-async def delete_ticket(request: Request, ticket_id: int, current_user: str, db: Session):
+async def delete_ticket(request: Request, ticket_id: int, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    ticket = db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
-    if ticket:
-        db.delete(ticket)
-        db.commit()
+    if await AsyncTicketService.delete_ticket(db, ticket_id, owner_id=ticket_owner_scope(request),
+                                              actor_id=request.state.auth.user_id):
+        hub.publish("deleted", {"id": ticket_id})
     
     return RedirectResponse(url="/my-tickets", status_code=302)
 
-async def manage_users_get(request: Request, current_user: str, db: Session):
+async def manage_users_get(request: Request, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.query(models.User).filter(models.User.username == current_user).first()
-    if not user or user.role != "it":
+    if request.state.auth.role != "it":
         return RedirectResponse(url="/log", status_code=302)
     
-    users = db.query(models.User).all()
+    users = await AsyncUserService.get_all_users(db)
     return templates.TemplateResponse("manage_users.html", {"request": request, "users": users})
 
-async def update_user_role(request: Request, user_id: int, role: str, current_user: str, db: Session):
+async def update_user_role(request: Request, user_id: int, role: str, current_user: str, db: AsyncSession):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    admin = db.query(models.User).filter(models.User.username == current_user).first()
-    if not admin or admin.role != "it":
+    if request.state.auth.role != "it":
         return RedirectResponse(url="/log", status_code=302)
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user and role in ["staff", "manager", "it"]:
-        user.role = role
-        db.commit()
+    if role in ["staff", "manager", "it"]:
+        user = await AsyncUserService.update_role(db, user_id, role)
+        if user:
+            auth_context.invalidate(user.username)
     
     return RedirectResponse(url="/manage-users", status_code=302)
+
+def metrics_snapshot():
+    return metrics.collect(
+        {"sync": database.engine, "async": database.async_engine.sync_engine},
+        auth.hash_pool.stats(),
+        extra=[
+            ("render_cache_hits_total", "counter", "Dashboard fragments served from cache.", render_cache.hits),
+            ("render_cache_misses_total", "counter", "Dashboard fragments rendered.", render_cache.misses),
+            ("render_cache_bytes", "gauge", "Approximate size of cached fragments.", render_cache.size),
+            ("render_cache_entries", "gauge", "Cached fragments.", len(render_cache)),
+            ("live_event_subscribers", "gauge", "Open /it/events streams.", hub.subscriber_count),
+            ("live_events_published_total", "counter", "Ticket events published.", hub.published),
+            ("rate_limit_checks_total", "counter", "Rate limit checks.", rate_limit_store.checks),
+            ("rate_limit_rejected_total", "counter", "Requests rejected with 429.", rate_limit_store.rejected),
+            ("rate_limit_store_errors_total", "counter", "Checks let through because the store failed.", rate_limit_store.errors),
+            ("duplicate_checks_total", "counter", "New tickets checked for duplicates.", detector.checks),
+            ("duplicate_matches_total", "counter", "New tickets linked to an open duplicate.", detector.matches),
+            ("duplicate_index_tickets", "gauge", "Open tickets held in the duplicate indexes, one per worker.", len(detector)),
+            ("write_queue_pending", "gauge", "Ticket writes waiting for the writer.", writer.pending),
+            ("write_queue_batches_total", "counter", "Transactions committed by the writer.", writer.batches),
+            ("write_queue_operations_total", "counter", "Ticket writes committed by the writer.", writer.operations),
+            ("write_queue_replayed_total", "counter", "Writes retried one by one after their group failed.", writer.replayed)
+        ]
+    )
+
+async def metrics_endpoint(request: Request):
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=404)
+    
+    if config.METRICS_TOKEN:
+        token = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not secrets.compare_digest(token, config.METRICS_TOKEN):
+            raise HTTPException(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    
+    snapshot = metrics_snapshot()
+    if config.METRICS_DIR:
+        # Any worker may answer; report the whole server.
+        shared = metrics.SharedMetrics(config.METRICS_DIR)
+        await run_in_threadpool(shared.publish, snapshot)
+        snapshots = await run_in_threadpool(shared.read)
+    else:
+        snapshots = [snapshot]
+    body = metrics.render(snapshots)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
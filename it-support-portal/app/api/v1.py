@@ -0,0 +1,268 @@
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Form, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+import app.core.auth as auth
+import app.core.rate_limit as rate_limit
+import app.core.rollups as rollups
+from app.api.routes import get_db
+from app.api.ui import get_ticket_query, publish_ticket, publish_tickets, ticket_owner_scope
+from app.core.auth_context import AuthContext
+from app.core.duplicates import detector
+from app.core.history import AsyncHistoryService
+from app.core.sla import AsyncSlaService
+from app.core.services import AsyncTicketService, AsyncUserService, TicketQuery
+from app.core.stats import AsyncStatsService, STATUSES, PRIORITIES
+
+# Handlers return ORJSONResponse directly, which skips FastAPI's
+# jsonable_encoder pass; orjson serialises datetimes natively.
+router = APIRouter(prefix="/api/v1", default_response_class=ORJSONResponse)
+
+TICKET_FIELDS = ("id", "name", "email", "department", "category", "issue", "status", "priority", "created_at", "closed_at", "owner_id", "duplicate_of")
+USER_FIELDS = ("id", "username", "email", "role")
+EVENT_FIELDS = ("occurred_at", "actor_id", "kind", "field", "old_value", "new_value")
+
+class TicketCreate(BaseModel):
+    name: str
+    issue: str
+    department: Optional[str] = None
+    category: Optional[str] = None
+    priority: str = "Medium"
+
+class TicketUpdate(BaseModel):
+    name: Optional[str] = None
+    department: Optional[str] = None
+    category: Optional[str] = None
+    issue: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+
+class TicketFilter(BaseModel):
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    department: Optional[str] = None
+    category: Optional[str] = None
+    owner: Optional[str] = None
+
+class BulkUpdate(BaseModel):
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    ticket_ids: Optional[List[int]] = None
+    filter: Optional[TicketFilter] = None
+
+def require_user(request: Request):
+    # request.state.auth is resolved from the cookie or a Bearer token by the
+    # middleware in main.py.
+    context = request.state.auth
+    if not context.is_authenticated:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return context
+
+def require_role(*roles):
+    def dependency(context: AuthContext = Depends(require_user)):
+        if context.role not in roles:
+            raise HTTPException(status_code=403, detail="Not permitted for this role")
+        return context
+    return dependency
+
+def parse_fields(fields: Optional[str], allowed: tuple):
+    """Resolve a ``fields=id,status`` projection against the allowed names."""
+    if not fields:
+        return allowed
+    requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    return requested or allowed
+
+def project(obj, fields: tuple):
+    return {name: getattr(obj, name) for name in fields}
+
+def check_choice(value: Optional[str], choices: list, label: str):
+    if value is not None and value not in choices:
+        raise HTTPException(status_code=400, detail=f"Unknown {label} '{value}'")
+
+def by_key(totals: dict):
+    # JSON object keys must be strings; tickets without a value are grouped.
+    return {key if key is not None else "Unassigned": n for key, n in totals.items()}
+
+def close_time_stats(close_times):
+    return {
+        "tickets": close_times.tickets,
+        "median_seconds": round(close_times.median) if close_times.tickets else None,
+        "p90_seconds": round(close_times.p90) if close_times.tickets else None
+    }
+
+@router.post("/token", dependencies=[Depends(rate_limit.login)])
+async def issue_token(username: str = Form(...), password: str = Form(...), db: AsyncSession = Depends(get_db)):
+    try:
+        user = await AsyncUserService.authenticate_user(db, username.replace(" ", ""), password)
+    except auth.HashPoolBusy:
+        raise HTTPException(status_code=503, detail="The server is busy, please try again in a moment")
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid credentials", headers={"WWW-Authenticate": "Bearer"})
+    expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return ORJSONResponse({
+        "access_token": auth.create_access_token(data={"sub": user.username}, expires_delta=expires),
+        "token_type": "bearer",
+        "expires_in": int(expires.total_seconds())
+    })
+
+@router.get("/tickets")
+async def list_tickets(request: Request, fields: Optional[str] = None, query: TicketQuery = Depends(get_ticket_query), context: AuthContext = Depends(require_user), db: AsyncSession = Depends(get_db)):
+    columns = parse_fields(fields, TICKET_FIELDS)
+    query.owner_id = ticket_owner_scope(request)
+    page = await AsyncTicketService.list_tickets(db, query)
+    return ORJSONResponse({
+        "items": [project(t, columns) for t in page.items],
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    })
+
+@router.get("/tickets/{ticket_id}")
+async def get_ticket(request: Request, ticket_id: int, fields: Optional[str] = None, context: AuthContext = Depends(require_user), db: AsyncSession = Depends(get_db)):
+    columns = parse_fields(fields, TICKET_FIELDS)
+    ticket = await AsyncTicketService.get_ticket(db, ticket_id, owner_id=ticket_owner_scope(request), include_archived=True)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return ORJSONResponse(project(ticket, columns))
+
+@router.get("/tickets/{ticket_id}/events")
+async def ticket_events(request: Request, ticket_id: int, context: AuthContext = Depends(require_user), db: AsyncSession = Depends(get_db)):
+    owner_id = ticket_owner_scope(request)
+    ticket = await AsyncTicketService.get_ticket(db, ticket_id, owner_id=owner_id, include_archived=True)
+    history = await AsyncHistoryService.get_history(db, ticket_id)
+    # IT staff can also read the history of deleted tickets.
+    if ticket is None and (owner_id is not None or not history):
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return ORJSONResponse({
+        "ticket_id": ticket_id,
+        "first_response_at": history.first_response_at,
+        "events": [project(event, EVENT_FIELDS) for event in history.events]
+    })
+
+@router.post("/tickets", status_code=201, dependencies=[Depends(rate_limit.tickets)])
+async def create_ticket(body: TicketCreate, context: AuthContext = Depends(require_user), db: AsyncSession = Depends(get_db)):
+    check_choice(body.priority, PRIORITIES, "priority")
+    if not body.name.strip() or not body.issue.strip():
+        raise HTTPException(status_code=400, detail="name and issue are required")
+    duplicate = await detector.find(db, body.department, body.category, body.issue)
+    ticket = await AsyncTicketService.create_ticket(db, body.name.strip(), body.issue.strip(), context.email, body.department,
+                                                    body.category, priority=body.priority, owner_id=context.user_id,
+                                                    duplicate_of=duplicate.ticket_id if duplicate else None)
+    detector.add(ticket)
+    publish_ticket("created", ticket)
+    return ORJSONResponse(project(ticket, TICKET_FIELDS), status_code=201)
+
+@router.patch("/tickets/{ticket_id}")
+async def update_ticket(request: Request, ticket_id: int, body: TicketUpdate, context: AuthContext = Depends(require_user), db: AsyncSession = Depends(get_db)):
+    owner_id = ticket_owner_scope(request)
+    ticket = await AsyncTicketService.get_ticket(db, ticket_id, owner_id=owner_id)
+    if ticket is None:
+        if await AsyncTicketService.get_ticket(db, ticket_id, owner_id=owner_id, include_archived=True):
+            raise HTTPException(status_code=409, detail="Archived tickets cannot be changed")
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    if body.status or body.priority:
+        # Triage is for IT staff, as on the dashboard.
+        if context.role != "it":
+            raise HTTPException(status_code=403, detail="Only IT staff can change status or priority")
+        check_choice(body.status, STATUSES, "status")
+        check_choice(body.priority, PRIORITIES, "priority")
+        ticket = await AsyncTicketService.update_ticket(db, ticket_id, body.status, body.priority, actor_id=context.user_id)
+        if ticket is None:
+            # Archived or deleted since the check above.
+            raise HTTPException(status_code=404, detail="Ticket not found")
+
+    if any(value is not None for value in (body.name, body.department, body.category, body.issue)):
+        ticket = await AsyncTicketService.edit_ticket(
+            db, ticket_id,
+            body.name.strip() if body.name is not None else ticket.name,
+            body.department if body.department is not None else ticket.department,
+            body.category if body.category is not None else ticket.category,
+            body.issue.strip() if body.issue is not None else ticket.issue,
+            actor_id=context.user_id
+        )
+        if ticket is None:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        detector.add(ticket)
+    publish_ticket("updated", ticket)
+    return ORJSONResponse(project(ticket, TICKET_FIELDS))
+
+@router.post("/tickets/bulk")
+async def bulk_update_tickets(body: BulkUpdate, context: AuthContext = Depends(require_role("it")), db: AsyncSession = Depends(get_db)):
+    query = None
+    if body.ticket_ids is None and body.filter is not None:
+        query = TicketQuery(body.filter.status, body.filter.priority, body.filter.department, body.filter.category, body.filter.owner)
+    try:
+        results = await AsyncTicketService.bulk_update(db, body.status, body.priority, ticket_ids=body.ticket_ids, query=query,
+                                                       actor_id=context.user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    updated_ids = [r["id"] for r in results if r["result"] == "updated"]
+    await publish_tickets(db, updated_ids)
+    return ORJSONResponse({"updated": len(updated_ids), "results": results})
+
+@router.get("/users/me")
+async def current_user(fields: Optional[str] = None, context: AuthContext = Depends(require_user), db: AsyncSession = Depends(get_db)):
+    user = await AsyncUserService.get_user(db, context.user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return ORJSONResponse(project(user, parse_fields(fields, USER_FIELDS)))
+
+@router.get("/users")
+async def list_users(fields: Optional[str] = None, context: AuthContext = Depends(require_role("it")), db: AsyncSession = Depends(get_db)):
+    columns = parse_fields(fields, USER_FIELDS)
+    users = await AsyncUserService.get_all_users(db)
+    return ORJSONResponse({"items": [project(u, columns) for u in users]})
+
+@router.get("/users/{user_id}")
+async def get_user(user_id: int, fields: Optional[str] = None, context: AuthContext = Depends(require_role("it")), db: AsyncSession = Depends(get_db)):
+    user = await AsyncUserService.get_user(db, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return ORJSONResponse(project(user, parse_fields(fields, USER_FIELDS)))
+
+@router.get("/stats")
+async def ticket_stats(status: Optional[str] = None, date_from: Optional[date] = None, date_to: Optional[date] = None, archived: bool = False, context: AuthContext = Depends(require_role("manager", "it")), db: AsyncSession = Depends(get_db)):
+    from app.core.export import ExportQuery
+    query = ExportQuery(status, date_from, date_to, archived=archived)
+    stats = await AsyncStatsService.get_ticket_stats(db, query.criteria(), query.archive_criteria())
+    return ORJSONResponse({
+        "total": stats.total,
+        "by_status": by_key(stats.by_status()),
+        "by_priority": by_key(stats.by_priority()),
+        "by_department": by_key(stats.by_department())
+    })
+
+@router.get("/stats/trends")
+async def ticket_trends(period: str = rollups.DEFAULT_PERIOD, context: AuthContext = Depends(require_role("manager", "it")), db: AsyncSession = Depends(get_db)):
+    check_choice(period, list(rollups.PERIODS), "period")
+    trend = await rollups.AsyncTrendService.get_trend(db, period)
+    return ORJSONResponse({
+        "period": trend.period,
+        "granularity": trend.granularity,
+        "buckets": [
+            {"start": bucket, "opened": opened, "closed": closed}
+            for bucket, opened, closed in zip(trend.buckets, trend.opened, trend.closed)
+        ],
+        "by_department": {
+            department or "Unassigned": {"opened": opened, "closed": closed}
+            for department, (opened, closed) in trend.by_department.items()
+        }
+    })
+
+@router.get("/stats/sla")
+async def sla_stats(context: AuthContext = Depends(require_role("manager", "it")), db: AsyncSession = Depends(get_db)):
+    summary = await AsyncSlaService.get_summary(db)
+    by_priority_department = {}
+    for (priority, department), close_times in summary.groups.items():
+        by_priority_department.setdefault(priority or "Unassigned", {})[department or "Unassigned"] = close_time_stats(close_times)
+    return ORJSONResponse({
+        "overall": close_time_stats(summary.overall()),
+        "by_priority": {key or "Unassigned": close_time_stats(value) for key, value in summary.by_priority().items()},
+        "by_department": {key or "Unassigned": close_time_stats(value) for key, value in summary.by_department().items()},
+        "by_priority_department": by_priority_department
+    })
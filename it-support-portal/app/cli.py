@@ -0,0 +1,164 @@
+import argparse
+import os
+import sys
+import tempfile
+import app.db.database as database
+import app.db.schema as schema
+from app.core import assets, rollups
+from app.core.archive import TicketArchiver
+from app.core.config import config
+from app.core.importer import TicketImporter, BATCH_SIZE, IMPORT_FORMATS, detect_format
+
+try:
+    from gunicorn.app.base import BaseApplication
+    GUNICORN_ENABLED = True
+except ImportError:
+    GUNICORN_ENABLED = False
+
+def import_tickets(args):
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        print("Cannot tell the format from the file name, pass --format", file=sys.stderr)
+        return 2
+
+    def progress(report):
+        print(f"\r{report.imported} imported, {report.rejected_count} rejected, {report.rate:,.0f} tickets/s",
+              end="", file=sys.stderr, flush=True)
+
+    schema.init_db(database.engine)
+    importer = TicketImporter(database.engine, batch_size=args.batch_size, progress=None if args.quiet else progress)
+    with open(args.path, "rb") as f:
+        report = importer.import_file(f, fmt)
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    for reject in report.rejected:
+        print(f"line {reject['line']}: {reject['reason']}", file=sys.stderr)
+    print(f"Imported {report.imported} of {report.processed} records in {report.seconds:.2f}s "
+          f"({report.rate:,.0f} tickets/s), {report.rejected_count} rejected")
+    return 1 if report.rejected_count else 0
+
+def archive_tickets(args):
+    def progress(total):
+        print(f"\r{total} archived", end="", file=sys.stderr, flush=True)
+
+    schema.init_db(database.engine)
+    archiver = TicketArchiver(database.engine, args.after_days, args.batch_size)
+    total = archiver.run(progress=None if args.quiet else progress)
+    if total and not args.quiet:
+        print(file=sys.stderr)
+    print(f"Archived {total} tickets closed more than {args.after_days} days ago")
+    return 0
+
+def rebuild_rollups(args):
+    schema.init_db(database.engine)
+    with database.engine.begin() as conn:
+        count = rollups.rebuild(conn)
+    print(f"Rebuilt hourly and daily rollups and close times from {count} tickets")
+    return 0
+
+def build_assets(args):
+    if args.fetch_vendor:
+        for path in assets.fetch_vendor():
+            print(f"Fetched {path}")
+    manifest = assets.build()
+    for name, path in sorted(manifest.items()):
+        print(f"{name} -> {path}")
+    for name in sorted(set(assets.BUNDLES) - set(manifest)):
+        print(f"{name} skipped: missing source files (see --fetch-vendor)", file=sys.stderr)
+    if not assets.BROTLI_ENABLED:
+        print("brotli is not installed; only .gz variants were written", file=sys.stderr)
+    return 0
+
+if GUNICORN_ENABLED:
+    class PortalApplication(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Imported in each worker after the fork, so every worker gets
+            # its own event loop, connection pools and caches.
+            from main import app
+            return app
+
+def serve(args):
+    # Migrate once here rather than in every worker's startup, then drop the
+    # connections so no SQLite handle is shared across the fork.
+    schema.init_db(database.engine)
+    database.engine.dispose()
+    # Likewise build the static bundles before any worker renders a page.
+    assets.build()
+    # Workers forked by gunicorn inherit the config object as it is now;
+    # uvicorn's spawned ones import it afresh and read the environment.
+    config.INIT_DB_ON_STARTUP = False
+    os.environ["INIT_DB_ON_STARTUP"] = "0"
+    if args.workers > 1 and not config.METRICS_DIR:
+        # Each worker keeps its own metrics; they meet in this directory so
+        # a scrape reports all of them.
+        config.METRICS_DIR = os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="portal-metrics-")
+
+    if GUNICORN_ENABLED:
+        # SIGHUP restarts the workers one by one after they finish their
+        # in-flight requests; SIGTERM shuts down gracefully.
+        options = {
+            "bind": f"{args.host}:{args.port}",
+            "workers": args.workers,
+            "worker_class": "uvicorn.workers.UvicornWorker",
+            "graceful_timeout": args.graceful_timeout,
+            "timeout": max(args.graceful_timeout, 30),
+            "keepalive": 5,
+            "max_requests": args.max_requests,
+            "max_requests_jitter": args.max_requests // 10,
+            "preload_app": False
+        }
+        PortalApplication(options).run()
+    else:
+        import uvicorn
+        print("gunicorn is not installed; using uvicorn's process manager (no graceful reload on SIGHUP)", file=sys.stderr)
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers, reload=False,
+                    timeout_graceful_shutdown=args.graceful_timeout,
+                    limit_max_requests=args.max_requests or None)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="IT Support Portal maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import-tickets", help="Bulk import tickets from a CSV or NDJSON file")
+    p.add_argument("path")
+    p.add_argument("--format", choices=IMPORT_FORMATS)
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    p.add_argument("--quiet", action="store_true")
+    p.set_defaults(func=import_tickets)
+
+    p = commands.add_parser("archive", help="Move long-closed tickets to the archive table")
+    p.add_argument("--after-days", type=int, default=config.ARCHIVE_AFTER_DAYS)
+    p.add_argument("--batch-size", type=int, default=config.ARCHIVE_BATCH_SIZE)
+    p.add_argument("--quiet", action="store_true")
+    p.set_defaults(func=archive_tickets)
+
+    p = commands.add_parser("rebuild-rollups", help="Recompute the trend rollup and time-to-close tables from all tickets")
+    p.set_defaults(func=rebuild_rollups)
+
+    p = commands.add_parser("build-assets", help="Bundle, fingerprint and precompress the static files")
+    p.add_argument("--fetch-vendor", action="store_true", help="Download missing third-party files first")
+    p.set_defaults(func=build_assets)
+
+    p = commands.add_parser("serve", help="Run the portal with several worker processes")
+    p.add_argument("--host", default=config.HOST)
+    p.add_argument("--port", type=int, default=config.PORT)
+    p.add_argument("--workers", type=int, default=config.WORKERS)
+    p.add_argument("--graceful-timeout", type=int, default=config.GRACEFUL_TIMEOUT)
+    p.add_argument("--max-requests", type=int, default=config.MAX_REQUESTS)
+    p.set_defaults(func=serve)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import DateTime, and_, delete, insert, literal, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from app.db import models
+from app.core import versioning
+
+ARCHIVE_COLUMNS = ("id", "name", "email", "department", "category", "issue", "status", "priority",
+                   "created_at", "owner_id", "closed_at", "duplicate_of")
+
+class ArchiveMismatch(Exception):
+    """Fewer tickets reached the archive than were selected; the batch is rolled back."""
+
+def copy_statement(ticket_ids: list, archived_at: datetime):
+    # A plain INSERT: if another worker copied one of these tickets first,
+    # the unique id makes this batch fail and roll back instead of deleting
+    # a hot row whose copy was skipped.
+    columns = list(ARCHIVE_COLUMNS) + ["archived_at"]
+    source = select(
+        *[getattr(models.Ticket, name) for name in ARCHIVE_COLUMNS], literal(archived_at, DateTime)
+    ).where(models.Ticket.id.in_(ticket_ids))
+    return insert(models.TicketArchive).from_select(columns, source)
+
+class TicketArchiver:
+    """Move tickets closed for more than ``after_days`` into tickets_archive.
+
+    Each batch is its own short transaction (copy, delete, version bump), so
+    request handlers only ever wait for one batch. Ticket ids are never
+    reused (AUTOINCREMENT, seeded past the archive by schema.migrate), so
+    an archived id cannot come back as a new hot ticket.
+    """
+
+    def __init__(self, engine, after_days: int, batch_size: int = 1000):
+        self.engine = engine
+        self.after_days = after_days
+        self.batch_size = batch_size
+
+    def archive_batch(self, now: datetime = None):
+        """Archive up to batch_size tickets; returns how many were moved."""
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=self.after_days)
+        with self.engine.begin() as conn:
+            ticket_ids = list(conn.execute(
+                select(models.Ticket.id)
+                .where(
+                    models.Ticket.status == "Closed",
+                    or_(
+                        models.Ticket.closed_at < cutoff,
+                        # Closed before close times were recorded.
+                        and_(models.Ticket.closed_at.is_(None), models.Ticket.created_at < cutoff)
+                    ),
+                    # A hot ticket sharing an archived id predates AUTOINCREMENT;
+                    # it stays hot rather than overwrite or lose either row.
+                    models.Ticket.id.not_in(select(models.TicketArchive.id))
+                )
+                .order_by(models.Ticket.closed_at)
+                .limit(self.batch_size)
+            ).scalars())
+            if not ticket_ids:
+                return 0
+            conn.execute(copy_statement(ticket_ids, now))
+            copied = list(conn.execute(
+                select(models.TicketArchive.id)
+                .where(models.TicketArchive.id.in_(ticket_ids), models.TicketArchive.archived_at == now)
+            ).scalars())
+            if len(copied) != len(ticket_ids):
+                # Leaving the transaction by raising rolls the copy back too.
+                raise ArchiveMismatch(f"copied {len(copied)} of {len(ticket_ids)} tickets to the archive")
+            conn.execute(delete(models.Ticket).where(models.Ticket.id.in_(copied)))
+            versioning.bump(conn)
+        return len(copied)
+
+    def run(self, progress=None):
+        """Archive everything that is due; returns the number of tickets moved."""
+        total = 0
+        while True:
+            moved = self.archive_batch()
+            if not moved:
+                return total
+            total += moved
+            if progress:
+                progress(total)
+
+async def archive_periodically(archiver: TicketArchiver, interval: float, pause: float):
+    """Background task: archive what is due every ``interval`` seconds, one
+    batch per thread hop with ``pause`` seconds between batches so writes
+    from request handlers are never held up for long."""
+    while True:
+        try:
+            while await run_in_threadpool(archiver.archive_batch):
+                await asyncio.sleep(pause)
+        except (SQLAlchemyError, ArchiveMismatch):
+            # Typically a lock timeout under write load, or tickets changed
+            # under a batch; try again next round.
+            pass
+        await asyncio.sleep(interval)
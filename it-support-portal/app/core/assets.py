@@ -0,0 +1,258 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import urllib.request
+import anyio
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+    BROTLI_ENABLED = True
+except ImportError:
+    BROTLI_ENABLED = False
+
+from app.core.config import config
+
+# Bundles by logical name, each built from files under the static directory
+# in this order.
+BUNDLES = {
+    "portal.css": ("style.css", "table_fix.css", "style_addition.css"),
+    "portal.js": ("js/portal.js",),
+    "chart.js": ("vendor/chart.umd.js",)
+}
+
+# Third-party files kept under static/vendor, with the pinned upstream copy
+# that `build-assets --fetch-vendor` downloads. Until a file is present the
+# page loads it from the upstream URL instead.
+CHART_JS_VERSION = "4.4.1"
+VENDOR = {
+    "vendor/chart.umd.js": f"https://cdn.jsdelivr.net/npm/chart.js@{CHART_JS_VERSION}/dist/chart.umd.js"
+}
+
+# Hashed bundles, their .gz/.br variants and the manifest go here, so they
+# are served under /static/dist/.
+BUILD_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Unhashed files keep their URL across edits, so browsers revalidate them.
+REVALIDATE = "no-cache"
+
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+_CSS_STRING = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+# A colon followed by ";" or "}" before any "{" is in a declaration, not in
+# a selector such as "a :hover" or an at-rule condition.
+_CSS_DECLARATION_COLON = re.compile(r"\s*:\s*(?=[^{};]*[;}])")
+_CSS_STASHED = re.compile(r"\0(\d+)\0")
+
+def minify_css(text: str):
+    # Strings are set aside and put back exactly as written; everything
+    # else loses comments and the whitespace that does not separate tokens.
+    strings = []
+
+    def stash(match):
+        strings.append(match.group(0))
+        return f"\0{len(strings) - 1}\0"
+
+    text = _CSS_STRING.sub(stash, _CSS_COMMENT.sub("", text))
+    text = _CSS_SPACE.sub(" ", text)
+    text = _CSS_PUNCTUATION.sub(r"\1", text)
+    text = _CSS_DECLARATION_COLON.sub(":", text).replace(";}", "}")
+    return _CSS_STASHED.sub(lambda match: strings[int(match.group(1))], text).strip()
+
+def _in_template_after(line: str, in_template: bool):
+    """Whether a template literal is still open at the end of ``line``.
+    Quotes, escapes and // comments are followed; ${} nesting is not."""
+    quote = None
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_template:
+            if char == "`":
+                in_template = False
+        elif quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "`":
+            in_template = True
+        elif line.startswith("//", i):
+            break
+        i += 1
+    return in_template
+
+def minify_js(text: str):
+    """Drops indentation, blank lines and whole-line // comments outside
+    template literals, whose lines are kept exactly. Nothing is renamed or
+    reordered."""
+    lines = []
+    in_template = False
+    for line in text.splitlines():
+        starts_in_template = in_template
+        in_template = _in_template_after(line, in_template)
+        if not starts_in_template:
+            # Trailing space of a line that opens a template is part of it.
+            line = line.lstrip() if in_template else line.strip()
+            if not line or line.startswith("//"):
+                continue
+        lines.append(line)
+    return "\n".join(lines)
+
+def minify(name: str, text: str):
+    if name.endswith(".css"):
+        return minify_css(text)
+    return minify_js(text)
+
+def hashed_name(name: str, content: bytes):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}"
+
+def compress(path: str, content: bytes):
+    # mtime=0 keeps the .gz byte-identical between builds of the same file.
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if BROTLI_ENABLED:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(content, quality=11))
+
+def fetch_vendor(static_dir: str = None):
+    """Download the pinned third-party files that are missing; returns their paths."""
+    static_dir = static_dir or config.STATIC_DIR
+    fetched = []
+    for source, url in VENDOR.items():
+        path = os.path.join(static_dir, source)
+        if os.path.exists(path):
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with urllib.request.urlopen(url, timeout=30) as response:
+            content = response.read()
+        with open(path, "wb") as f:
+            f.write(content)
+        fetched.append(path)
+    return fetched
+
+def build(static_dir: str = None):
+    """Bundle, minify, fingerprint and precompress every bundle whose sources
+    exist, then write the manifest. Files from the previous build are kept so
+    pages rendered before a deploy can still load them; older ones are removed.
+    Returns the new manifest."""
+    static_dir = static_dir or config.STATIC_DIR
+    build_dir = os.path.join(static_dir, BUILD_DIR)
+    os.makedirs(build_dir, exist_ok=True)
+    manifest_path = os.path.join(build_dir, MANIFEST_NAME)
+    previous = read_manifest(manifest_path)
+
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        paths = [os.path.join(static_dir, source) for source in sources]
+        if not all(os.path.exists(path) for path in paths):
+            continue
+        parts = []
+        for source, path in zip(sources, paths):
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            # Vendor files ship minified already.
+            parts.append(text if source in VENDOR else minify(name, text))
+        content = "\n".join(parts).encode("utf-8")
+        output = hashed_name(name, content)
+        path = os.path.join(build_dir, output)
+        with open(path, "wb") as f:
+            f.write(content)
+        compress(path, content)
+        manifest[name] = f"{BUILD_DIR}/{output}"
+
+    keep = {os.path.basename(path) for path in list(manifest.values()) + list(previous.values())}
+    for filename in os.listdir(build_dir):
+        if filename == MANIFEST_NAME:
+            continue
+        base = filename[:-3] if filename.endswith((".gz", ".br")) else filename
+        if base not in keep:
+            os.remove(os.path.join(build_dir, filename))
+
+    # Written last and renamed into place, so a reader never sees a manifest
+    # naming files that are not there yet.
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+def read_manifest(path: str):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+class AssetManifest:
+    """Maps bundle names to URLs for the templates. Read once per process;
+    workers pick up a new build when they restart."""
+
+    def __init__(self, static_dir: str, url_prefix: str = "/static"):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix
+        self._entries = None
+
+    def reload(self):
+        self._entries = read_manifest(os.path.join(self.static_dir, BUILD_DIR, MANIFEST_NAME))
+
+    def urls(self, name: str):
+        """The hashed bundle if it has been built, otherwise its source files."""
+        if self._entries is None:
+            self.reload()
+        built = self._entries.get(name)
+        if built is not None:
+            return [f"{self.url_prefix}/{built}"]
+        urls = []
+        for source in BUNDLES[name]:
+            if os.path.exists(os.path.join(self.static_dir, source)) or source not in VENDOR:
+                urls.append(f"{self.url_prefix}/{source}")
+            else:
+                urls.append(VENDOR[source])
+        return urls
+
+manifest = AssetManifest(config.STATIC_DIR)
+
+class AssetFiles(StaticFiles):
+    """StaticFiles with cache headers, serving the precompressed variant of a
+    built file when the client accepts it."""
+
+    async def get_response(self, path: str, scope):
+        built = path.startswith(BUILD_DIR + os.sep) and os.path.basename(path) != MANIFEST_NAME
+        if built and scope["method"] in ("GET", "HEAD"):
+            accepted = Headers(scope=scope).get("accept-encoding", "")
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result is None:
+                    continue
+                response = self.file_response(full_path, stat_result, scope)
+                if response.status_code == 200:
+                    # The type of the original file, not of the .gz/.br.
+                    response.headers["content-type"] = content_type(path)
+                response.headers["content-encoding"] = encoding
+                response.headers["vary"] = "Accept-Encoding"
+                response.headers["cache-control"] = IMMUTABLE
+                return response
+        response = await super().get_response(path, scope)
+        response.headers["cache-control"] = IMMUTABLE if built else REVALIDATE
+        if built:
+            response.headers["vary"] = "Accept-Encoding"
+        return response
+
+def content_type(path: str):
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return f"{media_type}; charset=utf-8" if media_type.startswith("text/") else media_type
@@ -0,0 +1,71 @@
+from sqlalchemy import select
+from app.core import auth, versioning
+from app.core.cache import TTLCache
+from app.core.config import config
+import app.db.database as database
+import app.db.models as models
+
+ROLE_PERMISSIONS = {"staff": 0, "manager": 1, "it": 2}
+
+class AuthContext:
+    def __init__(self, username: str = None, user_id: int = None, role: str = None, email: str = None):
+        self.username = username
+        self.user_id = user_id
+        self.role = role
+        self.email = email
+
+    @property
+    def is_authenticated(self):
+        return self.user_id is not None
+
+    @property
+    def permission(self):
+        return ROLE_PERMISSIONS.get(self.role, 0)
+
+ANONYMOUS = AuthContext()
+
+# username -> AuthContext, or ANONYMOUS for a token whose user no longer exists.
+_principals = TTLCache(maxsize=config.AUTH_CACHE_SIZE, ttl=config.AUTH_CACHE_TTL_SECONDS)
+# The users data version the cached principals were loaded under. Account
+# and role changes bump it in whichever worker makes them, so every worker
+# drops its cache on its next request instead of serving a demoted or
+# deleted user until the TTL runs out.
+_loaded_version = None
+
+async def load_principal(username: str):
+    global _loaded_version
+    async with database.AsyncSessionLocal() as db:
+        # One primary key lookup per request, cheaper than loading the user.
+        version, _ = await versioning.current_version(db, versioning.USERS)
+        if version != _loaded_version:
+            _principals.clear()
+            _loaded_version = version
+        context = _principals.get(username)
+        if context is not None:
+            return context
+        result = await db.execute(
+            select(models.User.id, models.User.role, models.User.email).where(models.User.username == username)
+        )
+        user = result.first()
+    context = AuthContext(username, user.id, user.role or "staff", user.email) if user else ANONYMOUS
+    _principals.set(username, context)
+    return context
+
+def request_token(request):
+    """The access token from an ``Authorization: Bearer`` header or the login cookie."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, credentials = authorization.partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials.strip()
+    return request.cookies.get("access_token")
+
+async def resolve(token: str):
+    """Decode the access token once and map it to a cached AuthContext."""
+    username = auth.verify_token(token) if token else None
+    if not username:
+        return ANONYMOUS
+    return await load_principal(username)
+
+def invalidate(username: str):
+    """Drop this worker's entry at once; other workers follow the users version."""
+    _principals.pop(username)
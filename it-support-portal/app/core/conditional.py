@@ -0,0 +1,34 @@
+import hashlib
+from email.utils import format_datetime
+from datetime import timezone
+from app.core.config import config
+
+def page_validators(request, version: int, updated_at=None):
+    """ETag and Last-Modified headers for a page built from ticket data ``version``.
+
+    The tag also covers the viewer (the nav bar shows their name and role),
+    the URL including its query string, and the app version so a deploy with
+    changed templates does not keep serving 304s.
+    """
+    context = request.state.auth
+    seed = f"{config.VERSION}:{version}:{context.user_id}:{context.role}:{request.url.path}?{request.url.query}"
+    headers = {
+        "ETag": f'W/"{hashlib.sha1(seed.encode()).hexdigest()[:24]}"',
+        # Pages differ per user, so shared caches must not store them and
+        # browsers must revalidate before reuse.
+        "Cache-Control": "private, no-cache"
+    }
+    if updated_at is not None:
+        headers["Last-Modified"] = format_datetime(updated_at.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+    return headers
+
+def is_not_modified(request, headers: dict):
+    """True only for a matching If-None-Match. If-Modified-Since alone is
+    ignored: the timestamp says nothing about which viewer the cached copy
+    was rendered for, while the ETag does."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    # Weak comparison: W/"x" and "x" name the same representation.
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or headers["ETag"].removeprefix("W/") in tags
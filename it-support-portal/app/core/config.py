@@ -3,17 +3,94 @@ from typing import Optional
 
 class Config:
     # Database
-    DATABASE_URL: str = "sqlite:///./tickets_v3.db"
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app/db/portal.db")
+    # Derived from DATABASE_URL when unset (sqlite -> aiosqlite, postgresql -> asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")
+    DB_POOL_SIZE: Optional[int] = int(os.getenv("DB_POOL_SIZE")) if os.getenv("DB_POOL_SIZE") else None
+    DB_MAX_OVERFLOW: Optional[int] = int(os.getenv("DB_MAX_OVERFLOW")) if os.getenv("DB_MAX_OVERFLOW") else None
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_ECHO: bool = os.getenv("DB_ECHO", "") == "1"
+    
+    # SQLite tuning
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64000))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    HASH_POOL_WORKERS: int = int(os.getenv("HASH_POOL_WORKERS", min(4, os.cpu_count() or 1)))
+    HASH_POOL_MAX_PENDING: int = int(os.getenv("HASH_POOL_MAX_PENDING", 64))
+    HASH_TIMEOUT_SECONDS: float = float(os.getenv("HASH_TIMEOUT_SECONDS", 5))
+    
+    # Rate limits ("<count>/<second|minute|hour|day>"), counted in a SQLite
+    # file shared by all worker processes on the host
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT_DATABASE: str = os.getenv("RATE_LIMIT_DATABASE", "./app/db/rate_limits.db")
+    RATE_LIMIT_LOGIN: str = os.getenv("RATE_LIMIT_LOGIN", "5/minute")
+    RATE_LIMIT_SIGNUP: str = os.getenv("RATE_LIMIT_SIGNUP", "3/minute")
+    RATE_LIMIT_TICKETS: str = os.getenv("RATE_LIMIT_TICKETS", "20/minute")
+    RATE_LIMIT_EXPORT: str = os.getenv("RATE_LIMIT_EXPORT", "10/minute")
+    
+    # Ticket writes from request handlers are queued and committed together:
+    # one transaction per batch of up to this many, lingering this long for more
+    WRITE_QUEUE_ENABLED: bool = os.getenv("WRITE_QUEUE_ENABLED", "1") == "1"
+    WRITE_BATCH_MAX_OPERATIONS: int = int(os.getenv("WRITE_BATCH_MAX_OPERATIONS", 64))
+    WRITE_BATCH_MAX_DELAY_MS: float = float(os.getenv("WRITE_BATCH_MAX_DELAY_MS", 2))
+    WRITE_QUEUE_MAX_PENDING: int = int(os.getenv("WRITE_QUEUE_MAX_PENDING", 1024))
+    
+    # New tickets are linked to a similar open ticket in the same department and
+    # category filed within the window (similarity is shingle Jaccard, 0-1)
+    DUPLICATE_DETECTION_ENABLED: bool = os.getenv("DUPLICATE_DETECTION_ENABLED", "1") == "1"
+    DUPLICATE_WINDOW_HOURS: float = float(os.getenv("DUPLICATE_WINDOW_HOURS", 72))
+    DUPLICATE_THRESHOLD: float = float(os.getenv("DUPLICATE_THRESHOLD", 0.5))
+    
+    # Closed tickets older than this move to tickets_archive, in batches, from
+    # a background task in every worker (interval 0 disables it)
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", 1000))
+    ARCHIVE_INTERVAL_SECONDS: float = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", 3600))
+    ARCHIVE_BATCH_PAUSE_SECONDS: float = float(os.getenv("ARCHIVE_BATCH_PAUSE_SECONDS", 0.05))
+    
+    # Rendered dashboard fragments, keyed by ticket data version
+    RENDER_CACHE_MAX_BYTES: int = int(os.getenv("RENDER_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+    GZIP_COMPRESS_LEVEL: int = int(os.getenv("GZIP_COMPRESS_LEVEL", 6))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", 4))
+    
+    # Live dashboard updates (Server-Sent Events)
+    EVENT_QUEUE_SIZE: int = int(os.getenv("EVENT_QUEUE_SIZE", 256))
+    EVENT_HEARTBEAT_SECONDS: float = float(os.getenv("EVENT_HEARTBEAT_SECONDS", 15))
+    # Bulk updates touching more tickets than this send one resync event
+    EVENT_BULK_ROW_LIMIT: int = int(os.getenv("EVENT_BULK_ROW_LIMIT", 100))
+    
+    # /metrics is open unless a token is set; scrapers then send it as a Bearer token
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_TOKEN: Optional[str] = os.getenv("METRICS_TOKEN")
+    # With several workers, each one writes its metrics here so that any of
+    # them can answer a scrape for the whole server. `serve` sets it up.
+    METRICS_DIR: Optional[str] = os.getenv("METRICS_DIR") or None
+    METRICS_PUBLISH_SECONDS: float = float(os.getenv("METRICS_PUBLISH_SECONDS", 5))
     
     # Server
-    HOST: str = "0.0.0.0"
-    PORT: int = 8000
-    DEBUG: bool = True
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", 8000))
+    # Auto-reload for `python main.py`; never used by the production launcher
+    DEBUG: bool = os.getenv("DEBUG", "") == "1"
+    WORKERS: int = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    # Seconds a worker gets to finish in-flight requests on restart or shutdown
+    GRACEFUL_TIMEOUT: int = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+    # Recycle a worker after this many requests (0 = never), with jitter
+    MAX_REQUESTS: int = int(os.getenv("MAX_REQUESTS", 0))
+    INIT_DB_ON_STARTUP: bool = os.getenv("INIT_DB_ON_STARTUP", "1") == "1"
     
     # Application
     APP_NAME: str = "IT Support Portal"
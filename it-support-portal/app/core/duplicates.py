@@ -0,0 +1,186 @@
+import random
+import re
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import models
+from app.core.config import config
+
+# MinHash signature of NUM_BANDS bands with ROWS_PER_BAND values each. Two
+# issues with shingle Jaccard similarity s share at least one band with
+# probability 1 - (1 - s**ROWS_PER_BAND) ** NUM_BANDS: 0.99 at s = 0.5 and
+# 0.78 at s = 0.3, so the exact check below rarely misses a real match.
+NUM_BANDS = 16
+ROWS_PER_BAND = 2
+SHINGLE_SIZE = 3
+
+OPEN_STATUSES = ("Open", "In Progress")
+
+# Candidates verified per check, newest first.
+MAX_CANDIDATES = 100
+PRUNE_INTERVAL = timedelta(minutes=5)
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240611)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_BANDS * ROWS_PER_BAND)]
+
+def shingles(text: str):
+    """Character trigrams of the lower-cased words, so small typos and word
+    order changes still overlap."""
+    normalized = " ".join(re.findall(r"\w+", (text or "").lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+def similarity(a: set, b: set):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def signature(shingle_set: set):
+    hashes = [zlib.crc32(s.encode()) for s in shingle_set] or [0]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+def band_keys(department: str, category: str, shingle_set: set):
+    values = signature(shingle_set)
+    return [
+        (department, category, band, tuple(values[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]))
+        for band in range(NUM_BANDS)
+    ]
+
+class DuplicateMatch:
+    def __init__(self, ticket_id: int, similarity: float):
+        self.ticket_id = ticket_id
+        self.similarity = similarity
+
+class DuplicateIndex:
+    """In-process MinHash/LSH index of recent open tickets, bucketed by
+    department and category.
+
+    A check hashes the new issue into NUM_BANDS band keys, collects the
+    tickets sharing any of them and verifies only those against the
+    database, so its cost depends on how many similar tickets exist rather
+    than on the table size. Before each check the index pulls in tickets
+    written since the last one (by any worker, through the primary key), so
+    every process sees the same tickets without any shared state. Closed,
+    deleted or edited tickets are sorted out by the verification query; an
+    edit is re-indexed by the worker that made it (add), while other workers
+    keep the old text's band keys and so may miss a match on the new text.
+
+    The check runs before the new ticket is written, so submissions whose
+    writes are in flight together (e.g. in the same write queue batch) do
+    not see each other and neither is linked.
+    """
+
+    def __init__(self, window: timedelta, threshold: float, enabled: bool = True):
+        self.window = window
+        self.threshold = threshold
+        self.enabled = enabled
+        self.checks = 0
+        self.matches = 0
+        self._buckets = defaultdict(set)
+        # ticket id -> (created_at, band keys)
+        self._entries = {}
+        self._last_id = None
+        self._pruned_at = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, ticket):
+        if not self.enabled or ticket is None:
+            return
+        self._add(ticket.id, ticket.department, ticket.category, ticket.issue, ticket.created_at)
+
+    def _add(self, ticket_id, department, category, issue, created_at):
+        self._remove(ticket_id)
+        keys = band_keys(department, category, shingles(issue))
+        for key in keys:
+            self._buckets[key].add(ticket_id)
+        self._entries[ticket_id] = (created_at, keys)
+        if self._last_id is not None:
+            self._last_id = max(self._last_id, ticket_id)
+
+    def _remove(self, ticket_id):
+        entry = self._entries.pop(ticket_id, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(ticket_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    async def refresh(self, db: AsyncSession, now: datetime):
+        since = now - self.window
+        columns = (models.Ticket.id, models.Ticket.status, models.Ticket.department, models.Ticket.category,
+                   models.Ticket.issue, models.Ticket.created_at)
+        if self._last_id is None:
+            last_id = (await db.execute(select(func.max(models.Ticket.id)))).scalar() or 0
+            stmt = select(*columns).where(models.Ticket.status.in_(OPEN_STATUSES), models.Ticket.created_at >= since)
+            self._last_id = last_id
+        else:
+            # A primary key range only; filtering on status here would make
+            # SQLite walk the status index over every open ticket. Ticket ids
+            # are never reused (AUTOINCREMENT), so everything new is above it.
+            stmt = select(*columns).where(models.Ticket.id > self._last_id)
+        for row in await db.execute(stmt):
+            self._last_id = max(self._last_id, row.id)
+            entry = self._entries.get(row.id)
+            if entry is not None and entry[0] == row.created_at:
+                continue
+            if row.status in OPEN_STATUSES and row.created_at is not None and row.created_at >= since:
+                self._add(row.id, row.department, row.category, row.issue, row.created_at)
+
+        if self._pruned_at is None or now - self._pruned_at >= PRUNE_INTERVAL:
+            for ticket_id, (created_at, _) in list(self._entries.items()):
+                if created_at is None or created_at < since:
+                    self._remove(ticket_id)
+            self._pruned_at = now
+
+    async def find(self, db: AsyncSession, department: str, category: str, issue: str, now: datetime = None):
+        """The open ticket a new submission most likely duplicates, or None."""
+        if not self.enabled:
+            return None
+        now = now or datetime.utcnow()
+        await self.refresh(db, now)
+        self.checks += 1
+
+        target = shingles(issue)
+        candidates = set()
+        for key in band_keys(department, category, target):
+            candidates.update(self._buckets.get(key, ()))
+        if not candidates:
+            return None
+
+        # Primary key lookups; the rest is checked here for the same reason as above.
+        rows = await db.execute(
+            select(models.Ticket.id, models.Ticket.status, models.Ticket.department, models.Ticket.category,
+                   models.Ticket.issue, models.Ticket.created_at, models.Ticket.duplicate_of)
+            .where(models.Ticket.id.in_(sorted(candidates, reverse=True)[:MAX_CANDIDATES]))
+        )
+        since = now - self.window
+        best = None
+        for row in rows:
+            if (row.status not in OPEN_STATUSES or row.department != department or row.category != category
+                    or row.created_at is None or row.created_at < since):
+                continue
+            score = similarity(target, shingles(row.issue))
+            # Ties go to the older ticket, which is more likely the original.
+            if score >= self.threshold and (best is None or (score, -row.id) > (best[0], -best[1].id)):
+                best = (score, row)
+        if best is None:
+            return None
+        self.matches += 1
+        score, row = best
+        # Link to the original rather than to another copy of it.
+        return DuplicateMatch(row.duplicate_of or row.id, score)
+
+detector = DuplicateIndex(
+    timedelta(hours=config.DUPLICATE_WINDOW_HOURS),
+    config.DUPLICATE_THRESHOLD,
+    enabled=config.DUPLICATE_DETECTION_ENABLED
+)
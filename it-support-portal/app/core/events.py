@@ -0,0 +1,68 @@
+import asyncio
+import json
+from app.core.config import config
+
+def format_event(event: str, data: dict):
+    """Encode one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+# Sent in place of the queued events when a subscriber falls behind; the
+# dashboard then offers a reload rather than showing a partial picture.
+RESYNC = format_event("resync", {"reason": "overflow"})
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, message: str):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(RESYNC)
+
+    async def next(self, timeout: float):
+        """The next message, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class EventHub:
+    """In-process fan-out of ticket events to SSE subscribers.
+
+    publish() encodes the message once and never waits on a subscriber: each
+    has a bounded queue, and a slow client loses its backlog (and is told to
+    resync) instead of holding up the writer or growing without limit. Must
+    be called from the event loop thread.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.published = 0
+        self._subscribers = set()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event: str, data: dict):
+        if not self._subscribers:
+            return
+        message = format_event(event, data)
+        for subscriber in self._subscribers:
+            subscriber.offer(message)
+        self.published += 1
+
+hub = EventHub(queue_size=config.EVENT_QUEUE_SIZE)
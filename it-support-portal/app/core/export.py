@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import models
+import app.db.database as database
+from app.core.rollups import AsyncTrendService
+from app.core.sla import AsyncSlaService, format_duration
+from app.core.stats import AsyncStatsService
+
+EXPORT_FORMATS = {
+    "text": ("text/plain", "txt"),
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson")
+}
+
+EXPORT_COLUMNS = ["id", "name", "email", "department", "category", "issue", "status", "priority", "created_at"]
+
+# Rows fetched per round-trip and bytes buffered before a chunk is handed to
+# the response. Together they bound memory regardless of the table size.
+FETCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+# Daily activity shown in the text report when no date range is given.
+TREND_DAYS = timedelta(days=30)
+
+class ExportQuery:
+    # Reports cover archived history by default; dashboards never do.
+    def __init__(self, status: str = None, date_from: date = None, date_to: date = None, archived: bool = True):
+        self.status = status or None
+        self.date_from = date_from
+        self.date_to = date_to
+        self.archived = archived
+
+    def criteria(self, table=models.Ticket):
+        conditions = []
+        if self.status:
+            conditions.append(table.status == self.status)
+        if self.date_from:
+            conditions.append(table.created_at >= datetime.combine(self.date_from, time.min))
+        if self.date_to:
+            # date_to is inclusive: everything before the following midnight.
+            conditions.append(table.created_at < datetime.combine(self.date_to + timedelta(days=1), time.min))
+        return conditions
+
+    def archive_criteria(self):
+        """Criteria for tickets_archive, or None when archived tickets are excluded."""
+        return self.criteria(models.TicketArchive) if self.archived else None
+
+class ExportService:
+    @staticmethod
+    async def iter_rows(db: AsyncSession, query: ExportQuery):
+        # Archived tickets first, then the hot table, each in id order.
+        tables = (models.TicketArchive, models.Ticket) if query.archived else (models.Ticket,)
+        for table in tables:
+            columns = [getattr(table, name) for name in EXPORT_COLUMNS]
+            stmt = select(*columns).where(*query.criteria(table)).order_by(table.id)
+            # stream() uses a server-side cursor; rows arrive FETCH_SIZE at a time.
+            result = await db.stream(stmt)
+            async for partition in result.partitions(FETCH_SIZE):
+                for row in partition:
+                    yield row
+
+    @staticmethod
+    async def stream(fmt: str, query: ExportQuery):
+        """Yield the export as encoded chunks of roughly CHUNK_SIZE bytes.
+
+        The generator owns its session so it stays valid for as long as the
+        response is being sent.
+        """
+        writer = {"text": _write_text, "csv": _write_csv, "ndjson": _write_ndjson}[fmt]
+        async with database.AsyncSessionLocal() as db:
+            buffer = io.StringIO()
+            async for _ in writer(db, query, buffer):
+                if buffer.tell() >= CHUNK_SIZE:
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+
+    @staticmethod
+    def filename(fmt: str):
+        return f"ticket_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{EXPORT_FORMATS[fmt][1]}"
+
+# Each writer appends to ``out`` and yields after every row so stream() can
+# flush the buffer once it is large enough.
+
+async def _write_csv(db: AsyncSession, query: ExportQuery, out):
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    yield
+    async for row in ExportService.iter_rows(db, query):
+        writer.writerow(row)
+        yield
+
+async def _write_ndjson(db: AsyncSession, query: ExportQuery, out):
+    async for row in ExportService.iter_rows(db, query):
+        record = dict(zip(EXPORT_COLUMNS, row))
+        if record["created_at"]:
+            record["created_at"] = record["created_at"].isoformat()
+        out.write(json.dumps(record))
+        out.write("\n")
+        yield
+
+async def _write_text(db: AsyncSession, query: ExportQuery, out):
+    stats = await AsyncStatsService.get_ticket_stats(db, query.criteria(), query.archive_criteria())
+
+    out.write("IT Support Portal - Ticket Summary Report\n")
+    out.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    out.write("="*60 + "\n\n")
+
+    out.write(f"Total Tickets: {stats.total}\n")
+    out.write(f"Open: {stats.count(status='Open')}\n")
+    out.write(f"In Progress: {stats.count(status='In Progress')}\n")
+    out.write(f"Closed: {stats.count(status='Closed')}\n\n")
+
+    out.write(f"Priority Breakdown:\n")
+    out.write(f"High: {stats.count(priority='High')}\n")
+    out.write(f"Medium: {stats.count(priority='Medium')}\n")
+    out.write(f"Low: {stats.count(priority='Low')}\n\n")
+
+    out.write(f"Department Breakdown:\n")
+    for department, count in sorted(stats.by_department().items(), key=lambda item: str(item[0])):
+        out.write(f"{department or 'Unassigned'}: {count}\n")
+    out.write("\n")
+
+    # Daily activity for the report's date range, or the last 30 days, from
+    # the rollups. The status filter does not apply here.
+    end = datetime.combine(query.date_to + timedelta(days=1), time.min) if query.date_to else datetime.utcnow()
+    start = datetime.combine(query.date_from, time.min) if query.date_from else end - TREND_DAYS
+    trend = await AsyncTrendService.get_range(db, start, end, "day")
+    out.write("Daily Activity, opened / closed (UTC):\n")
+    for label, opened, closed in zip(trend.labels(), trend.opened, trend.closed):
+        out.write(f"{label}: {opened} / {closed}\n")
+    out.write(f"Total: {trend.total_opened} / {trend.total_closed}\n\n")
+
+    # From the time-to-close histogram, over every closed ticket.
+    summary = await AsyncSlaService.get_summary(db)
+    out.write("Time to Close, median / p90:\n")
+    for label, groups in (("Priority", summary.by_priority()), ("Department", summary.by_department())):
+        for key, close_times in sorted(groups.items(), key=lambda item: str(item[0])):
+            out.write(f"{label} {key or 'Unassigned'}: {format_duration(close_times.median)} / "
+                      f"{format_duration(close_times.p90)} ({close_times.tickets} tickets)\n")
+    out.write("\n")
+
+    out.write("="*60 + "\n")
+    out.write("Ticket Details:\n")
+    out.write("="*60 + "\n\n")
+    yield
+
+    async for ticket in ExportService.iter_rows(db, query):
+        out.write(f"Ticket #{ticket.id}\n")
+        out.write(f"Name: {ticket.name}\n")
+        out.write(f"Email: {ticket.email}\n")
+        out.write(f"Department: {ticket.department}\n")
+        out.write(f"Category: {ticket.category}\n")
+        out.write(f"Status: {ticket.status}\n")
+        out.write(f"Priority: {ticket.priority}\n")
+        out.write(f"Issue: {ticket.issue}\n")
+        out.write("-"*60 + "\n\n")
+        yield
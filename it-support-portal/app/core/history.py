@@ -0,0 +1,79 @@
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import models
+
+# Ticket fields whose changes are logged, in the order a change lists them.
+TRACKED_FIELDS = ("status", "priority", "name", "department", "category", "issue")
+
+def snapshot(ticket):
+    """Tracked values of a Ticket, row or column dict; None for no ticket."""
+    if ticket is None:
+        return None
+    if isinstance(ticket, dict):
+        return {name: ticket.get(name) for name in TRACKED_FIELDS}
+    return {name: getattr(ticket, name) for name in TRACKED_FIELDS}
+
+class EventLog:
+    """ticket_events rows collected for one write. Like rollups.RollupDelta,
+    the caller applies it in the transaction that makes the change."""
+
+    def __init__(self, actor_id: int = None, now: datetime = None):
+        self.actor_id = actor_id
+        self.now = now or datetime.utcnow()
+        self.rows = []
+
+    def created(self, ticket_id: int, after: dict):
+        self._append(ticket_id, "created", "status", None, after["status"])
+        return self
+
+    def deleted(self, ticket_id: int, before: dict):
+        self._append(ticket_id, "deleted", "status", before["status"], None)
+        return self
+
+    def change(self, ticket_id: int, before: dict, after: dict):
+        """One row per tracked field that differs; fields missing from ``after`` are unchanged."""
+        for name in TRACKED_FIELDS:
+            if name in after and before.get(name) != after[name]:
+                self._append(ticket_id, "changed", name, before.get(name), after[name])
+        return self
+
+    def _append(self, ticket_id, kind, field, old_value, new_value):
+        self.rows.append({
+            "ticket_id": ticket_id, "occurred_at": self.now, "actor_id": self.actor_id,
+            "kind": kind, "field": field, "old_value": old_value, "new_value": new_value
+        })
+
+def record(db, log: EventLog):
+    """Sync variant for a Session or Connection that is already in a transaction."""
+    if log.rows:
+        db.execute(models.TicketEvent.__table__.insert(), log.rows)
+
+async def record_async(db: AsyncSession, log: EventLog):
+    if log.rows:
+        await db.execute(models.TicketEvent.__table__.insert(), log.rows)
+
+class TicketHistory:
+    def __init__(self, ticket_id: int, events: list):
+        self.ticket_id = ticket_id
+        self.events = events
+
+    def __bool__(self):
+        return bool(self.events)
+
+    @property
+    def first_response_at(self):
+        """When the status first moved on from the one the ticket was filed with."""
+        for event in self.events:
+            if event.kind == "changed" and event.field == "status":
+                return event.occurred_at
+        return None
+
+class AsyncHistoryService:
+    @staticmethod
+    async def get_history(db: AsyncSession, ticket_id: int):
+        result = await db.execute(
+            select(models.TicketEvent).where(models.TicketEvent.ticket_id == ticket_id)
+            .order_by(models.TicketEvent.occurred_at, models.TicketEvent.id)
+        )
+        return TicketHistory(ticket_id, result.scalars().all())
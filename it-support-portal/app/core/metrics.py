@@ -0,0 +1,296 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+import jinja2
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+
+# Latency buckets in seconds, and statement-count buckets per request.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _labels(names: tuple, values: tuple):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def load(self, samples):
+        for labels, value in samples:
+            self.inc(*labels, amount=value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and a few additions under a lock."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            return [[list(labels), list(counts), total, count] for labels, (counts, total, count) in self._series.items()]
+
+    def load(self, samples):
+        with self._lock:
+            for labels, counts, total, count in samples:
+                series = self._series.get(tuple(labels))
+                if series is None:
+                    series = self._series[tuple(labels)] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += count
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                le = bound if bound == "+Inf" else _number(float(bound))
+                bucket_labels = _labels(self.labelnames + ("le",), labels + (le,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(float(total))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+def gauge(name: str, help: str, samples):
+    """Render a gauge from (labels dict, value) pairs read at scrape time."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return lines
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time until the response starts, by route.", ("method", "route", "status")
+)
+REQUEST_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements issued per request.", ("route",), COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram("http_request_db_seconds", "Time spent in SQL per request.", ("route",))
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed.", ("engine",))
+DB_STATEMENT_SECONDS = Histogram("db_statement_duration_seconds", "SQL statement execution time.", ("engine",))
+TEMPLATE_SECONDS = Histogram("template_render_seconds", "Jinja2 template render time.", ("template",))
+COLLECTED = (REQUEST_SECONDS, REQUEST_STATEMENTS, REQUEST_DB_SECONDS, DB_STATEMENTS, DB_STATEMENT_SECONDS, TEMPLATE_SECONDS)
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+# Set by the timing middleware; the engine hooks add to it. The object is
+# shared by reference, so tasks and greenlets spawned for the request that
+# copy the context still update the same counters.
+current_request = ContextVar("current_request", default=None)
+
+def instrument_engine(engine, label: str):
+    """Attach statement timing to a sync Engine (use async_engine.sync_engine for async)."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # after_cursor_execute does not run for a failed statement.
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_STATEMENTS.inc(label)
+        DB_STATEMENT_SECONDS.observe(elapsed, label)
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+
+class TimedTemplate(jinja2.Template):
+    """Template class that records how long each top-level render takes."""
+
+    def render(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            TEMPLATE_SECONDS.observe(time.perf_counter() - started, self.name or "<string>")
+
+def pool_samples(engines: dict):
+    # StaticPool (in-memory SQLite) has no size accounting, so skip it.
+    samples = {"checked_out": [], "size": [], "overflow": []}
+    for label, engine in engines.items():
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            continue
+        samples["checked_out"].append(({"engine": label}, pool.checkedout()))
+        samples["size"].append(({"engine": label}, pool.size()))
+        # overflow() counts down from -pool_size while the pool is not full.
+        samples["overflow"].append(({"engine": label}, max(pool.overflow(), 0)))
+    return samples
+
+def collect(engines: dict, hash_stats: dict, extra=()):
+    """This process's metrics as plain data, for render() here or in another worker."""
+    gauges = []
+    pools = pool_samples(engines)
+    gauges.append(("db_pool_checked_out", "gauge", "Connections currently checked out.", pools["checked_out"]))
+    gauges.append(("db_pool_size", "gauge", "Configured pool size.", pools["size"]))
+    gauges.append(("db_pool_overflow", "gauge", "Connections open beyond pool_size.", pools["overflow"]))
+
+    for name, kind, key, help in (
+        ("password_hash_pending", "gauge", "pending", "Hash jobs queued or running."),
+        ("password_hash_seconds_max", "gauge", "hash_seconds_max", "Slowest bcrypt call so far."),
+        ("password_hash_wait_seconds_max", "gauge", "wait_seconds_max", "Longest wait for a hash worker so far."),
+        ("password_hash_completed_total", "counter", "completed", "bcrypt calls completed."),
+        ("password_hash_rejected_total", "counter", "rejected", "Hash jobs rejected because the queue was full."),
+        ("password_hash_timeouts_total", "counter", "timeouts", "Hash jobs that timed out."),
+        ("password_hash_seconds_total", "counter", "hash_seconds_total", "Time spent in bcrypt."),
+        ("password_hash_wait_seconds_total", "counter", "wait_seconds_total", "Time hash jobs spent waiting for a worker.")
+    ):
+        gauges.append((name, kind, help, [({}, hash_stats[key])]))
+
+    # (name, "counter" or "gauge", help, value) from other subsystems.
+    for name, kind, help, value in extra:
+        gauges.append((name, kind, help, [({}, value)]))
+
+    return {
+        "pid": os.getpid(),
+        "metrics": {metric.name: metric.samples() for metric in COLLECTED},
+        "values": [[name, kind, help, [[labels, value] for labels, value in samples]] for name, kind, help, samples in gauges]
+    }
+
+def render(snapshots: list):
+    """Prometheus text exposition of the snapshots from collect(), added up.
+
+    Counters, histograms and gauges are summed across processes, except
+    *_max gauges, which take the largest value.
+    """
+    lines = []
+    for metric in COLLECTED:
+        merged = metric.__class__(metric.name, metric.help, metric.labelnames,
+                                  *((metric.buckets,) if isinstance(metric, Histogram) else ()))
+        for snapshot in snapshots:
+            merged.load(snapshot["metrics"].get(metric.name, []))
+        lines.extend(merged.render())
+
+    values = {}
+    for snapshot in snapshots:
+        for name, kind, help, samples in snapshot["values"]:
+            entry = values.setdefault(name, (kind, help, {}))
+            for labels, value in samples:
+                key = tuple(sorted(labels.items()))
+                previous = entry[2].get(key)
+                if previous is None:
+                    entry[2][key] = value
+                else:
+                    entry[2][key] = max(previous, value) if name.endswith("_max") else previous + value
+    for name, (kind, help, samples) in values.items():
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}"])
+        for labels, value in samples.items():
+            lines.append(f"{name}{_labels(tuple(k for k, _ in labels), tuple(v for _, v in labels))} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+class SharedMetrics:
+    """Per-worker snapshot files in one directory, so a scrape answered by
+    any worker reports the whole server.
+
+    Each worker rewrites its own file every few seconds and right before it
+    answers a scrape. Files of workers that have exited still count towards
+    the counters and histograms, so totals never go backwards when a worker
+    is recycled, but their gauges are dropped.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def publish(self, snapshot: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{snapshot['pid']}.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(path + ".tmp", path)
+
+    def read(self):
+        snapshots = []
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not _alive(snapshot["pid"]):
+                snapshot["values"] = [entry for entry in snapshot["values"] if entry[1] == "counter"]
+            snapshots.append(snapshot)
+        return snapshots
+
+def _alive(pid: int):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+async def publish_periodically(shared: SharedMetrics, snapshot, interval: float):
+    """Background task: keep this worker's file current for scrapes answered elsewhere."""
+    try:
+        while True:
+            await run_in_threadpool(shared.publish, snapshot())
+            await asyncio.sleep(interval)
+    finally:
+        # Counts since the last round would otherwise be lost on shutdown.
+        shared.publish(snapshot())
@@ -0,0 +1,85 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(value, row_id: int, direction: str = "next"):
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps([value, row_id, direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Return (value, id, direction) or None for a missing or malformed cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        if direction not in ("next", "prev"):
+            return None
+        return value, int(row_id), direction
+    except (ValueError, TypeError, KeyError):
+        return None
+
+def keyset_filter(column, id_column, value, row_id: int, descending: bool):
+    # Rows strictly after (value, row_id) in the order Keyset.apply() sets:
+    # NULL lowest, so NULLs come first ascending and last descending. The
+    # order is explicit because PostgreSQL sorts NULL highest by default.
+    if value is None:
+        tie = id_column < row_id if descending else id_column > row_id
+        if descending:
+            return and_(column.is_(None), tie)
+        return or_(column.isnot(None), and_(column.is_(None), tie))
+    if descending:
+        return or_(column < value, column.is_(None), and_(column == value, id_column < row_id))
+    return or_(column > value, and_(column == value, id_column > row_id))
+
+class Keyset:
+    """One keyset page ordered by (column, id).
+
+    apply() adds the cursor condition, ordering and a ``limit + 1`` bound to a
+    select(); page() turns the fetched rows into (rows, next_cursor, prev_cursor).
+    """
+
+    def __init__(self, column, id_column, descending: bool, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+        self.column = column
+        self.id_column = id_column
+        self.limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+        self.decoded = decode_cursor(cursor)
+        self.direction = self.decoded[2] if self.decoded else "next"
+        # Walking backwards is the same scan with the order flipped.
+        self.scan_descending = descending if self.direction == "next" else not descending
+
+    def apply(self, stmt):
+        if self.decoded:
+            stmt = stmt.where(keyset_filter(self.column, self.id_column, self.decoded[0], self.decoded[1], self.scan_descending))
+        if self.scan_descending:
+            stmt = stmt.order_by(self.column.desc().nulls_last(), self.id_column.desc())
+        else:
+            stmt = stmt.order_by(self.column.asc().nulls_first(), self.id_column.asc())
+        return stmt.limit(self.limit + 1)
+
+    def page(self, rows):
+        rows = list(rows)
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if self.direction == "prev":
+            rows.reverse()
+
+        if not rows:
+            return rows, None, None
+
+        key = self.column.key
+        first, last = rows[0], rows[-1]
+        has_cursor = self.decoded is not None
+        has_next = has_more if self.direction == "next" else has_cursor
+        has_prev = has_cursor if self.direction == "next" else has_more
+        next_cursor = encode_cursor(getattr(last, key), last.id, "next") if has_next else None
+        prev_cursor = encode_cursor(getattr(first, key), first.id, "prev") if has_prev else None
+        return rows, next_cursor, prev_cursor
@@ -0,0 +1,155 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import config
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Expired windows are swept on every Nth check rather than on a timer.
+PRUNE_EVERY = 1000
+
+def parse_rule(rule: str):
+    """``"5/minute"`` -> (5, 60)."""
+    count, _, period = rule.partition("/")
+    period = period.strip().lower().rstrip("s")
+    if period not in PERIODS:
+        raise ValueError(f"Unknown rate limit period in '{rule}'")
+    return int(count), PERIODS[period]
+
+class SlidingWindowStore:
+    """Sliding-window counters in a SQLite file shared by every worker process.
+
+    Each key keeps the hit count of the current fixed window and of the one
+    before it; the previous count is weighted by how much of it still
+    overlaps the sliding window. A check is one indexed read and one write
+    inside a BEGIN IMMEDIATE transaction, so concurrent workers serialise on
+    the file lock and never double-count. Rejected attempts are not counted.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.checks = 0
+        self.rejected = 0
+        self.errors = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=config.SQLITE_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Losing a few counters in a crash is harmless; skip the fsyncs.
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, window_start INTEGER NOT NULL, current INTEGER NOT NULL, "
+                "previous INTEGER NOT NULL, expires_at INTEGER NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window: int, now: float = None):
+        """Record a hit for ``key`` if allowed; returns (allowed, retry_after seconds)."""
+        now = time.time() if now is None else now
+        window_start = int(now // window) * window
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_start, current, previous FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            current = previous = 0
+            if row is not None:
+                if row[0] == window_start:
+                    current, previous = row[1], row[2]
+                elif row[0] == window_start - window:
+                    previous = row[1]
+
+            overlap = 1 - (now - window_start) / window
+            allowed = previous * overlap + current + 1 <= limit
+            if allowed:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (key, window_start, current, previous, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, window_start, current + 1, previous, window_start + 2 * window)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self.checks += 1
+            prune = self.checks % PRUNE_EVERY == 0
+            if not allowed:
+                self.rejected += 1
+        if prune:
+            conn.execute("DELETE FROM rate_limits WHERE expires_at < ?", (int(now),))
+
+        if allowed:
+            return True, 0
+        return False, self._retry_after(limit, window, now, window_start, current, previous)
+
+    @staticmethod
+    def _retry_after(limit: int, window: int, now: float, window_start: int, current: int, previous: int):
+        # Seconds until the weighted previous window has decayed enough to
+        # admit one more hit, or until the next window if current alone is full.
+        if current + 1 <= limit and previous:
+            overlap_needed = (limit - current - 1) / previous
+            wait = window_start + window * (1 - overlap_needed) - now
+        else:
+            wait = window_start + window - now
+        return max(1, math.ceil(wait))
+
+    def reset(self):
+        self._connection().execute("DELETE FROM rate_limits")
+
+store = SlidingWindowStore(config.RATE_LIMIT_DATABASE)
+
+def client_key(request: Request, per_user: bool):
+    context = getattr(request.state, "auth", None)
+    if per_user and context is not None and context.is_authenticated:
+        return f"user:{context.user_id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+class RateLimit:
+    """FastAPI dependency enforcing ``rule`` (e.g. ``"5/minute"``) per client.
+
+    Limits with the same name share counters, so the HTML form and the API
+    endpoint for the same action draw from one budget. ``per_user`` keys
+    signed-in users by account instead of by address.
+    """
+
+    def __init__(self, name: str, rule: str, per_user: bool = False):
+        self.name = name
+        self.rule = rule
+        self.limit, self.window = parse_rule(rule)
+        self.per_user = per_user
+
+    async def __call__(self, request: Request):
+        if not config.RATE_LIMIT_ENABLED:
+            return
+        key = f"{self.name}:{client_key(request, self.per_user)}"
+        try:
+            allowed, retry_after = await run_in_threadpool(store.hit, key, self.limit, self.window)
+        except sqlite3.Error:
+            # Fail open: an unavailable limiter store must not take logins down.
+            store.errors += 1
+            return
+        if not allowed:
+            raise HTTPException(
+                status_code=429, detail=f"Too many requests, limit is {self.rule}", headers={"Retry-After": str(retry_after)}
+            )
+
+login = RateLimit("login", config.RATE_LIMIT_LOGIN)
+signup = RateLimit("signup", config.RATE_LIMIT_SIGNUP)
+tickets = RateLimit("tickets", config.RATE_LIMIT_TICKETS, per_user=True)
+export = RateLimit("export", config.RATE_LIMIT_EXPORT, per_user=True)
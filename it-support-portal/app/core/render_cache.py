@@ -0,0 +1,51 @@
+import sys
+import threading
+from collections import OrderedDict
+
+class RenderCache:
+    """Thread-safe LRU of rendered HTML fragments bounded by their total size.
+
+    Keys carry the data version they were rendered from, so entries never
+    need invalidating: a write bumps the version, later lookups miss, and the
+    stale entries age out of the LRU.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value: str):
+        cost = sys.getsizeof(value)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.size -= sys.getsizeof(previous)
+            self._data[key] = value
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.size -= sys.getsizeof(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import models
+from app.core import sla
+
+# Rollup tables by bucket size. Counts are derived from the tickets as they
+# are now: reopening a ticket takes back its close, deleting it takes back
+# both events, so an incremental total always equals a fresh rebuild. The
+# time-to-close histogram in CloseTimeBucket follows the same rule.
+TABLES = {"hour": models.HourlyTicketRollup, "day": models.DailyTicketRollup}
+ROLLUP_KEYS = ("bucket", "department", "category", "priority")
+CLOSE_TIME_KEYS = ("priority", "department", "bucket")
+
+FACT_FIELDS = ("created_at", "closed_at", "department", "category", "priority")
+
+# Trend windows and the rollup each one reads.
+PERIODS = {
+    "week": ("hour", timedelta(days=7)),
+    "month": ("day", timedelta(days=30)),
+    "quarter": ("day", timedelta(days=91))
+}
+DEFAULT_PERIOD = "month"
+
+REBUILD_FETCH_SIZE = 10000
+
+def truncate(moment: datetime, granularity: str):
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def facts(ticket):
+    """The fields rollups depend on, from a Ticket, row or column dict; None for no ticket."""
+    if ticket is None:
+        return None
+    if isinstance(ticket, dict):
+        values = [ticket.get(name) for name in FACT_FIELDS]
+    else:
+        values = [getattr(ticket, name) for name in FACT_FIELDS]
+    created_at, closed_at, *keys = values
+    return (created_at, closed_at, *[key or "" for key in keys])
+
+class RollupDelta:
+    """Net opened/closed changes per rollup row, collected for one write."""
+
+    def __init__(self):
+        self.changes = {}
+        # (priority, department, close time bucket) -> tickets
+        self.close_times = {}
+
+    def add(self, ticket_facts, sign: int = 1):
+        if ticket_facts is None:
+            return
+        created_at, closed_at, department, category, priority = ticket_facts
+        for granularity in TABLES:
+            if created_at is not None:
+                self._count(granularity, created_at, department, category, priority, 0, sign)
+            if closed_at is not None:
+                self._count(granularity, closed_at, department, category, priority, 1, sign)
+        bucket = sla.close_time_bucket(created_at, closed_at)
+        if bucket is not None:
+            key = (priority, department, bucket)
+            self.close_times[key] = self.close_times.get(key, 0) + sign
+
+    def change(self, before, after):
+        """Record a ticket going from ``before`` to ``after`` (facts() tuples, None if absent)."""
+        if before != after:
+            self.add(before, -1)
+            self.add(after, 1)
+        return self
+
+    def _count(self, granularity, moment, department, category, priority, column, sign):
+        key = (granularity, truncate(moment, granularity), department, category, priority)
+        counts = self.changes.setdefault(key, [0, 0])
+        counts[column] += sign
+
+    def rows(self, granularity: str):
+        return [
+            {"bucket": bucket, "department": department, "category": category, "priority": priority,
+             "opened": opened, "closed": closed}
+            for (g, bucket, department, category, priority), (opened, closed) in self.changes.items()
+            if g == granularity and (opened or closed)
+        ]
+
+    def close_time_rows(self):
+        return [
+            {"priority": priority, "department": department, "bucket": bucket, "tickets": tickets}
+            for (priority, department, bucket), tickets in self.close_times.items()
+            if tickets
+        ]
+
+def upsert_statement(dialect: str, table, keys: tuple = ROLLUP_KEYS, counters: tuple = ("opened", "closed")):
+    insert = pg_insert if dialect == "postgresql" else sqlite_insert
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: getattr(table, name) + getattr(stmt.excluded, name) for name in counters}
+    )
+
+def _statements(dialect: str, delta: RollupDelta):
+    for granularity, table in TABLES.items():
+        yield upsert_statement(dialect, table), delta.rows(granularity)
+    yield (upsert_statement(dialect, models.CloseTimeBucket, CLOSE_TIME_KEYS, ("tickets",)),
+           delta.close_time_rows())
+
+def _dialect_name(db):
+    # Connections know their dialect; Sessions go through their bind.
+    dialect = getattr(db, "dialect", None) or db.get_bind().dialect
+    return dialect.name
+
+def apply(db, delta: RollupDelta):
+    """Sync variant for a Session or Connection that is already in a transaction."""
+    for stmt, rows in _statements(_dialect_name(db), delta):
+        if rows:
+            db.execute(stmt, rows)
+
+async def apply_async(db: AsyncSession, delta: RollupDelta):
+    for stmt, rows in _statements(db.bind.dialect.name, delta):
+        if rows:
+            await db.execute(stmt, rows)
+
+def rebuild(conn):
+    """Recompute every rollup and close time row from tickets and
+    tickets_archive; returns the ticket count."""
+    delta = RollupDelta()
+    count = 0
+    for source in (models.Ticket, models.TicketArchive):
+        result = conn.execution_options(stream_results=True).execute(
+            select(*[getattr(source, name) for name in FACT_FIELDS])
+        )
+        for partition in result.partitions(REBUILD_FETCH_SIZE):
+            for row in partition:
+                delta.add(facts(row))
+            count += len(partition)
+    tables = [(table, delta.rows(granularity)) for granularity, table in TABLES.items()]
+    tables.append((models.CloseTimeBucket, delta.close_time_rows()))
+    for table, rows in tables:
+        conn.execute(delete(table))
+        if rows:
+            conn.execute(table.__table__.insert(), rows)
+    return count
+
+class Trend:
+    def __init__(self, period: str, granularity: str, buckets: list, opened: list, closed: list, by_department: dict):
+        self.period = period
+        self.granularity = granularity
+        self.buckets = buckets
+        self.opened = opened
+        self.closed = closed
+        # department -> (opened, closed)
+        self.by_department = by_department
+
+    @property
+    def total_opened(self):
+        return sum(self.opened)
+
+    @property
+    def total_closed(self):
+        return sum(self.closed)
+
+    def labels(self):
+        fmt = "%m-%d %H:00" if self.granularity == "hour" else "%Y-%m-%d"
+        return [bucket.strftime(fmt) for bucket in self.buckets]
+
+def bucket_range(start: datetime, end: datetime, granularity: str):
+    step = timedelta(hours=1) if granularity == "hour" else timedelta(days=1)
+    bucket = truncate(start, granularity)
+    buckets = []
+    while bucket < end:
+        buckets.append(bucket)
+        bucket += step
+    return buckets
+
+class AsyncTrendService:
+    @staticmethod
+    async def get_trend(db: AsyncSession, period: str = DEFAULT_PERIOD, now: datetime = None):
+        granularity, span = PERIODS[period]
+        now = now or datetime.utcnow()
+        return await AsyncTrendService.get_range(db, now - span, now, granularity, period)
+
+    @staticmethod
+    async def get_range(db: AsyncSession, start: datetime, end: datetime, granularity: str = "day", period: str = None):
+        """Opened/closed per bucket in [start, end), with empty buckets filled in."""
+        table = TABLES[granularity]
+        window = (table.bucket >= truncate(start, granularity), table.bucket < end)
+        totals = await db.execute(
+            select(table.bucket, func.sum(table.opened), func.sum(table.closed))
+            .where(*window).group_by(table.bucket)
+        )
+        counts = {bucket: (opened, closed) for bucket, opened, closed in totals}
+        departments = await db.execute(
+            select(table.department, func.sum(table.opened), func.sum(table.closed))
+            .where(*window).group_by(table.department)
+        )
+        buckets = bucket_range(start, end, granularity)
+        return Trend(
+            period, granularity, buckets,
+            [counts.get(bucket, (0, 0))[0] for bucket in buckets],
+            [counts.get(bucket, (0, 0))[1] for bucket in buckets],
+            {department: (opened, closed) for department, opened, closed in departments if opened or closed}
+        )
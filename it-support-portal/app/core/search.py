@@ -0,0 +1,98 @@
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import DateTime, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import models
+
+SEARCH_LIMIT = 50
+
+# FTS5 wraps matches in control characters, which survive HTML escaping, so
+# highlight() can escape the stored text first and only then add <mark> tags.
+_OPEN, _CLOSE = "\x02", "\x03"
+
+# bm25 column weights, in tickets_fts column order: issue, name, department, category.
+# tickets_archive_fts has the same layout, so both tables share one query shape.
+def _fts_query(fts: str, table: str):
+    return text(f"""
+        SELECT t.id, t.status, t.priority, t.created_at,
+               highlight({fts}, 1, '{_OPEN}', '{_CLOSE}') AS name,
+               highlight({fts}, 2, '{_OPEN}', '{_CLOSE}') AS department,
+               highlight({fts}, 3, '{_OPEN}', '{_CLOSE}') AS category,
+               snippet({fts}, 0, '{_OPEN}', '{_CLOSE}', '...', 24) AS issue,
+               bm25({fts}, 4.0, 2.0, 1.0, 1.0) AS rank
+        FROM {fts}
+        JOIN {table} t ON t.id = {fts}.rowid
+        WHERE {fts} MATCH :match
+          AND (:owner_id IS NULL OR t.owner_id = :owner_id)
+        ORDER BY rank
+        LIMIT :limit
+    """).columns(created_at=DateTime)
+
+_FTS_QUERY = _fts_query("tickets_fts", "tickets")
+_ARCHIVE_FTS_QUERY = _fts_query("tickets_archive_fts", "tickets_archive")
+
+def highlight(value):
+    if value is None:
+        return Markup("")
+    return Markup(str(escape(value)).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>"))
+
+def match_expression(q: str):
+    """Turn free text into an FTS5 query: every word must match, the last as a prefix."""
+    terms = re.findall(r"\w+", q or "")
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+class SearchHit:
+    def __init__(self, id, status, priority, created_at, name, department, category, issue, archived=False):
+        self.id = id
+        self.status = status
+        self.priority = priority
+        self.created_at = created_at
+        self.name = highlight(name)
+        self.department = highlight(department)
+        self.category = highlight(category)
+        self.issue = highlight(issue)
+        self.archived = archived
+
+class AsyncSearchService:
+    @staticmethod
+    async def search(db: AsyncSession, q: str, owner_id: int = None, limit: int = SEARCH_LIMIT):
+        match = match_expression(q)
+        if not match:
+            return []
+        if db.bind.dialect.name != "sqlite":
+            return await AsyncSearchService._search_like(db, q, owner_id, limit)
+        params = {"match": match, "owner_id": owner_id, "limit": limit}
+        hot = (await db.execute(_FTS_QUERY, params)).all()
+        archived = (await db.execute(_ARCHIVE_FTS_QUERY, params)).all()
+        # bm25 scores from the two indexes are on comparable scales (lower is
+        # better), so merging by score keeps the best matches from either.
+        rows = sorted([(row, False) for row in hot] + [(row, True) for row in archived], key=lambda item: item[0].rank)
+        return [SearchHit(*row[:-1], archived=is_archived) for row, is_archived in rows[:limit]]
+
+    @staticmethod
+    async def _search_like(db: AsyncSession, q: str, owner_id: int, limit: int):
+        # Backends without FTS5 get an unranked substring match, hot tickets first.
+        pattern = f"%{q.strip()}%"
+        hits = []
+        for table in (models.Ticket, models.TicketArchive):
+            if len(hits) >= limit:
+                break
+            stmt = select(table).where(or_(
+                table.issue.ilike(pattern),
+                table.name.ilike(pattern),
+                table.department.ilike(pattern),
+                table.category.ilike(pattern)
+            ))
+            if owner_id is not None:
+                stmt = stmt.where(table.owner_id == owner_id)
+            result = await db.execute(stmt.order_by(table.created_at.desc()).limit(limit - len(hits)))
+            hits += [
+                SearchHit(t.id, t.status, t.priority, t.created_at, t.name, t.department, t.category, t.issue,
+                          archived=table is models.TicketArchive)
+                for t in result.scalars()
+            ]
+        return hits
@@ -1,6 +1,13 @@
+from datetime import datetime
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from urllib.parse import urlencode
 from app.db import models
-from app.core import auth
+from app.core import auth, history, rollups, versioning
+from app.core.pagination import Keyset, DEFAULT_PAGE_SIZE
+from app.core.stats import StatsService, AsyncStatsService, STATUSES, PRIORITIES
+from app.core.write_queue import writer
 
 class UserService:
     @staticmethod
@@ -8,6 +15,7 @@ class UserService:
         hashed_password = auth.get_password_hash(password)
         user = models.User(username=username, password=hashed_password)
         db.add(user)
+        versioning.bump(db, versioning.USERS)
         db.commit()
         return user
     
@@ -36,15 +44,128 @@ class UserService:
         user = UserService.get_user_by_username(db, username)
         if user:
             db.delete(user)
+            versioning.bump(db)
+            versioning.bump(db, versioning.USERS)
             db.commit()
             return True
         return False
 
+def owner_id_for(username: str):
+    return select(models.User.id).where(models.User.username == username).scalar_subquery()
+
+def closed_at_for(status: str, previous_status: str, previous_closed_at: datetime, now: datetime):
+    # closed_at marks when the ticket was closed, which drives archiving and
+    # the closed counts in the rollups.
+    if status != "Closed":
+        return None
+    if previous_status == "Closed":
+        # Including an unknown (NULL) close time, which stays unknown.
+        return previous_closed_at
+    return now
+
+def set_status(ticket: models.Ticket, status: str, now: datetime = None):
+    ticket.closed_at = closed_at_for(status, ticket.status, ticket.closed_at, now or datetime.utcnow())
+    ticket.status = status
+
+def status_values(status: str, now: datetime):
+    """UPDATE values setting ``status``, matching closed_at_for() row by row."""
+    if status != "Closed":
+        return {"status": status, "closed_at": None}
+    return {"status": status, "closed_at": case((models.Ticket.status == "Closed", models.Ticket.closed_at), else_=now)}
+
+class TicketQuery:
+    FILTERS = ("status", "priority", "department", "category", "owner")
+    SORT_COLUMNS = ("created_at", "id", "status", "priority", "department", "category")
+
+    def __init__(self, status: str = None, priority: str = None, department: str = None, category: str = None,
+                 owner: str = None, sort: str = "created_at", order: str = "desc", cursor: str = None,
+                 limit: int = DEFAULT_PAGE_SIZE, owner_id: int = None, archived: bool = False):
+        # Empty strings come from the "All" option of the filter selects.
+        self.status = status or None
+        self.priority = priority or None
+        self.department = department or None
+        self.category = category or None
+        self.owner = owner or None
+        self.sort = sort if sort in self.SORT_COLUMNS else "created_at"
+        self.order = "asc" if order == "asc" else "desc"
+        self.cursor = cursor or None
+        self.limit = limit
+        # Set by the handler, never from the query string.
+        self.owner_id = owner_id
+        # Read tickets_archive instead of the hot table.
+        self.archived = bool(archived)
+
+    @property
+    def table(self):
+        return models.TicketArchive if self.archived else models.Ticket
+
+    def criteria(self):
+        table = self.table
+        conditions = []
+        if self.status:
+            conditions.append(table.status == self.status)
+        if self.priority:
+            conditions.append(table.priority == self.priority)
+        if self.department:
+            conditions.append(table.department == self.department)
+        if self.category:
+            conditions.append(table.category == self.category)
+        if self.owner:
+            conditions.append(table.owner_id == owner_id_for(self.owner))
+        if self.owner_id is not None:
+            conditions.append(table.owner_id == self.owner_id)
+        return conditions
+
+    def keyset(self):
+        return Keyset(
+            getattr(self.table, self.sort),
+            self.table.id,
+            descending=self.order == "desc",
+            cursor=self.cursor,
+            limit=self.limit
+        )
+
+    @property
+    def is_filtered(self):
+        return any(getattr(self, name) for name in self.FILTERS)
+
+    def params(self, **overrides):
+        values = {name: getattr(self, name) for name in self.FILTERS + ("sort", "order", "cursor")}
+        values["limit"] = self.limit if self.limit != DEFAULT_PAGE_SIZE else None
+        values["archived"] = 1 if self.archived else None
+        values.update(overrides)
+        if values.get("sort") == "created_at":
+            values["sort"] = None
+        if values.get("order") == "desc":
+            values["order"] = None
+        return urlencode({k: v for k, v in values.items() if v})
+
+    def url(self, path: str, **overrides):
+        params = self.params(**overrides)
+        return f"{path}?{params}" if params else path
+
+    def sort_url(self, path: str, column: str):
+        # Clicking the active column flips the order; a new column starts descending.
+        order = "asc" if self.sort == column and self.order == "desc" else "desc"
+        return self.url(path, sort=column, order=order, cursor=None)
+
+class TicketPage:
+    def __init__(self, items, next_cursor: str = None, prev_cursor: str = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
 class TicketService:
     @staticmethod
-    def create_ticket(db: Session, name: str, issue: str, status: str = "Open", priority: str = "Medium"):
-        ticket = models.Ticket(name=name, issue=issue, status=status, priority=priority)
+    def create_ticket(db: Session, name: str, issue: str, status: str = "Open", priority: str = "Medium", owner_id: int = None):
+        now = datetime.utcnow()
+        ticket = models.Ticket(name=name, issue=issue, priority=priority, owner_id=owner_id, created_at=now)
+        set_status(ticket, status, now)
         db.add(ticket)
+        db.flush()
+        rollups.apply(db, rollups.RollupDelta().change(None, rollups.facts(ticket)))
+        history.record(db, history.EventLog(owner_id, now).created(ticket.id, history.snapshot(ticket)))
+        versioning.bump(db)
         db.commit()
         return ticket
     
@@ -52,28 +173,309 @@ class TicketService:
     def get_all_tickets(db: Session):
         return db.query(models.Ticket).all()
     
+    @staticmethod
+    def list_tickets(db: Session, query: TicketQuery):
+        keyset = query.keyset()
+        stmt = keyset.apply(select(query.table).where(*query.criteria()))
+        return TicketPage(*keyset.page(db.execute(stmt).scalars()))
+    
     @staticmethod
     def get_tickets_by_user(db: Session, username: str):
-        return db.query(models.Ticket).filter(models.Ticket.name.ilike(f"%{username}%")).all()
+        return db.query(models.Ticket).filter(models.Ticket.owner_id == owner_id_for(username)).all()
     
     @staticmethod
-    def update_ticket(db: Session, ticket_id: int, status: str = None, priority: str = None):
+    def update_ticket(db: Session, ticket_id: int, status: str = None, priority: str = None, actor_id: int = None):
         ticket = db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
         if ticket:
+            log = history.EventLog(actor_id)
+            before, before_values = rollups.facts(ticket), history.snapshot(ticket)
             if status:
-                ticket.status = status
+                set_status(ticket, status, log.now)
             if priority:
                 ticket.priority = priority
+            rollups.apply(db, rollups.RollupDelta().change(before, rollups.facts(ticket)))
+            history.record(db, log.change(ticket.id, before_values, history.snapshot(ticket)))
+            versioning.bump(db)
             db.commit()
             return ticket
         return None
     
     @staticmethod
     def get_ticket_stats(db: Session):
-        tickets = TicketService.get_all_tickets(db)
+        stats = StatsService.get_ticket_stats(db)
+        return {
+            "total": stats.total,
+            "open": stats.count(status="Open"),
+            "in_progress": stats.count(status="In Progress"),
+            "closed": stats.count(status="Closed")
+        }
+
+# Async counterparts used by the request handlers. They share statements with
+# the sync services above, which remain for scripts and schema tooling.
+
+# Keeps each IN (...) list well under SQLite's bound-parameter limit.
+BULK_CHUNK_SIZE = 500
+
+class AsyncUserService:
+    @staticmethod
+    async def create_user(db: AsyncSession, username: str, email: str, password: str, role: str = "staff"):
+        hashed_password = await auth.get_password_hash_async(password)
+        user = models.User(username=username, email=email, password=hashed_password, role=role)
+        db.add(user)
+        await versioning.bump_async(db, versioning.USERS)
+        await db.commit()
+        return user
+    
+    @staticmethod
+    async def get_user(db: AsyncSession, user_id: int):
+        return await db.get(models.User, user_id)
+    
+    @staticmethod
+    async def get_user_by_username(db: AsyncSession, username: str):
+        result = await db.execute(select(models.User).where(models.User.username == username))
+        return result.scalars().first()
+    
+    @staticmethod
+    async def get_user_by_login(db: AsyncSession, login: str):
+        result = await db.execute(
+            select(models.User).where((models.User.username == login) | (models.User.email == login))
+        )
+        return result.scalars().first()
+    
+    @staticmethod
+    async def get_all_users(db: AsyncSession):
+        result = await db.execute(select(models.User))
+        return result.scalars().all()
+    
+    @staticmethod
+    async def authenticate_user(db: AsyncSession, login: str, password: str):
+        user = await AsyncUserService.get_user_by_login(db, login)
+        if user and await auth.verify_password_async(password, user.password):
+            return user
+        return None
+    
+    @staticmethod
+    async def update_password(db: AsyncSession, user: models.User, new_password: str):
+        user.password = await auth.get_password_hash_async(new_password)
+        await db.commit()
+    
+    @staticmethod
+    async def update_role(db: AsyncSession, user_id: int, role: str):
+        user = await db.get(models.User, user_id)
+        if user:
+            user.role = role
+            await versioning.bump_async(db, versioning.USERS)
+            await db.commit()
+        return user
+    
+    @staticmethod
+    async def delete_user(db: AsyncSession, username: str):
+        user = await AsyncUserService.get_user_by_username(db, username)
+        if user:
+            await db.delete(user)
+            # Their tickets lose owner_id through ON DELETE SET NULL.
+            await versioning.bump_async(db)
+            await versioning.bump_async(db, versioning.USERS)
+            await db.commit()
+            return True
+        return False
+
+class TicketWrites:
+    """Ticket writes that stage their changes without committing. Handlers
+    reach them through AsyncTicketService, which hands them to the write
+    queue so that concurrent writes share one transaction."""
+
+    @staticmethod
+    async def create_ticket(db: AsyncSession, name: str, issue: str, email: str, department: str,
+                            category: str, status: str, priority: str, owner_id: int, duplicate_of: int):
+        now = datetime.utcnow()
+        ticket = models.Ticket(name=name, email=email, department=department, category=category, issue=issue,
+                               priority=priority, owner_id=owner_id, duplicate_of=duplicate_of, created_at=now)
+        set_status(ticket, status, now)
+        db.add(ticket)
+        # The event needs the new ticket's id.
+        await db.flush()
+        await rollups.apply_async(db, rollups.RollupDelta().change(None, rollups.facts(ticket)))
+        await history.record_async(db, history.EventLog(owner_id, now).created(ticket.id, history.snapshot(ticket)))
+        await versioning.bump_async(db)
+        return ticket
+    
+    @staticmethod
+    async def update_ticket(db: AsyncSession, ticket_id: int, status: str, priority: str, actor_id: int):
+        ticket = await db.get(models.Ticket, ticket_id)
+        if ticket:
+            log = history.EventLog(actor_id)
+            before, before_values = rollups.facts(ticket), history.snapshot(ticket)
+            if status:
+                set_status(ticket, status, log.now)
+            if priority:
+                ticket.priority = priority
+            await rollups.apply_async(db, rollups.RollupDelta().change(before, rollups.facts(ticket)))
+            await history.record_async(db, log.change(ticket.id, before_values, history.snapshot(ticket)))
+            await versioning.bump_async(db)
+        return ticket
+    
+    @staticmethod
+    async def bulk_update(db: AsyncSession, criteria: list, status: str, priority: str, actor_id: int):
+        """Set status/priority on every ticket matching ``criteria``; returns their ids, sorted."""
+        now = datetime.utcnow()
+        values = {}
+        if status:
+            values.update(status_values(status, now))
+        if priority:
+            values["priority"] = priority
+        # The current values are needed anyway to adjust the rollups and log the changes.
+        columns = [getattr(models.Ticket, name) for name in rollups.FACT_FIELDS]
+        rows = (await db.execute(select(models.Ticket.id, models.Ticket.status, *columns).where(*criteria))).all()
+        delta = rollups.RollupDelta()
+        log = history.EventLog(actor_id, now)
+        changes = {name: value for name, value in (("status", status), ("priority", priority)) if value}
+        for row in rows:
+            after = dict(row._mapping)
+            if status:
+                after["closed_at"] = closed_at_for(status, row.status, row.closed_at, now)
+            if priority:
+                after["priority"] = priority
+            delta.change(rollups.facts(row), rollups.facts(after))
+            log.change(row.id, dict(row._mapping), changes)
+        found_ids = sorted(row.id for row in rows)
+        if not found_ids:
+            return found_ids
+        for start in range(0, len(found_ids), BULK_CHUNK_SIZE):
+            chunk = found_ids[start:start + BULK_CHUNK_SIZE]
+            await db.execute(
+                update(models.Ticket).where(models.Ticket.id.in_(chunk)).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        # Tickets loaded by earlier writes in the same group must not keep
+        # the values this UPDATE replaced.
+        found = set(found_ids)
+        for obj in list(db.sync_session.identity_map.values()):
+            if isinstance(obj, models.Ticket) and obj.id in found:
+                await db.refresh(obj)
+        await rollups.apply_async(db, delta)
+        await history.record_async(db, log)
+        await versioning.bump_async(db)
+        return found_ids
+    
+    @staticmethod
+    async def edit_ticket(db: AsyncSession, ticket_id: int, name: str, department: str, category: str, issue: str,
+                          owner_id: int, actor_id: int):
+        ticket = await AsyncTicketService.get_ticket(db, ticket_id, owner_id)
+        if ticket:
+            before, before_values = rollups.facts(ticket), history.snapshot(ticket)
+            ticket.name = name
+            ticket.department = department
+            ticket.category = category
+            ticket.issue = issue
+            await rollups.apply_async(db, rollups.RollupDelta().change(before, rollups.facts(ticket)))
+            await history.record_async(db, history.EventLog(actor_id).change(ticket.id, before_values, history.snapshot(ticket)))
+            await versioning.bump_async(db)
+        return ticket
+    
+    @staticmethod
+    async def delete_ticket(db: AsyncSession, ticket_id: int, owner_id: int, actor_id: int):
+        ticket = await AsyncTicketService.get_ticket(db, ticket_id, owner_id)
+        if ticket:
+            await db.delete(ticket)
+            await rollups.apply_async(db, rollups.RollupDelta().change(rollups.facts(ticket), None))
+            await history.record_async(db, history.EventLog(actor_id).deleted(ticket.id, history.snapshot(ticket)))
+            await versioning.bump_async(db)
+            return True
+        return False
+
+class AsyncTicketService:
+    @staticmethod
+    async def create_ticket(db: AsyncSession, name: str, issue: str, email: str = None, department: str = None,
+                            category: str = None, status: str = "Open", priority: str = "Medium", owner_id: int = None,
+                            duplicate_of: int = None):
+        return await writer.submit(db, TicketWrites.create_ticket, name, issue, email, department, category,
+                                   status, priority, owner_id, duplicate_of)
+    
+    @staticmethod
+    async def get_ticket(db: AsyncSession, ticket_id: int, owner_id: int = None, include_archived: bool = False):
+        # With owner_id, tickets belonging to someone else are treated as missing.
+        # Archived tickets are read-only, so only readers ask for them.
+        ticket = await db.get(models.Ticket, ticket_id)
+        if ticket is None and include_archived:
+            ticket = await db.get(models.TicketArchive, ticket_id)
+        if ticket and owner_id is not None and ticket.owner_id != owner_id:
+            return None
+        return ticket
+    
+    @staticmethod
+    async def get_tickets(db: AsyncSession, ticket_ids: list):
+        tickets = []
+        for start in range(0, len(ticket_ids), BULK_CHUNK_SIZE):
+            chunk = ticket_ids[start:start + BULK_CHUNK_SIZE]
+            result = await db.execute(select(models.Ticket).where(models.Ticket.id.in_(chunk)))
+            tickets.extend(result.scalars())
+        return tickets
+    
+    @staticmethod
+    async def list_tickets(db: AsyncSession, query: TicketQuery):
+        keyset = query.keyset()
+        result = await db.execute(keyset.apply(select(query.table).where(*query.criteria())))
+        return TicketPage(*keyset.page(result.scalars()))
+    
+    @staticmethod
+    async def get_tickets_by_user(db: AsyncSession, username: str):
+        result = await db.execute(select(models.Ticket).where(models.Ticket.owner_id == owner_id_for(username)))
+        return result.scalars().all()
+    
+    @staticmethod
+    async def update_ticket(db: AsyncSession, ticket_id: int, status: str = None, priority: str = None, actor_id: int = None):
+        return await writer.submit(db, TicketWrites.update_ticket, ticket_id, status, priority, actor_id)
+    
+    @staticmethod
+    async def bulk_update(db: AsyncSession, status: str = None, priority: str = None, ticket_ids=None, query: TicketQuery = None,
+                          actor_id: int = None):
+        """Apply status/priority to the given ids, or to every ticket matching ``query``.
+
+        Runs as one queued write with one UPDATE per chunk of ids and returns
+        a {"id", "result"} entry per requested ticket.
+        """
+        if status and status not in STATUSES:
+            raise ValueError(f"Unknown status '{status}'")
+        if priority and priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'")
+        if not status and not priority:
+            raise ValueError("Nothing to update")
+        
+        if ticket_ids is not None:
+            requested = list(dict.fromkeys(ticket_ids))
+            criteria = [models.Ticket.id.in_(requested)]
+        elif query is not None:
+            if query.archived:
+                raise ValueError("Archived tickets cannot be changed")
+            requested = None
+            criteria = query.criteria()
+        else:
+            raise ValueError("Either ticket_ids or query is required")
+        
+        found_ids = await writer.submit(db, TicketWrites.bulk_update, criteria, status, priority, actor_id)
+        found = set(found_ids)
+        return [
+            {"id": ticket_id, "result": "updated" if ticket_id in found else "not_found"}
+            for ticket_id in (requested if requested is not None else found_ids)
+        ]
+    
+    @staticmethod
+    async def edit_ticket(db: AsyncSession, ticket_id: int, name: str, department: str, category: str, issue: str,
+                          owner_id: int = None, actor_id: int = None):
+        return await writer.submit(db, TicketWrites.edit_ticket, ticket_id, name, department, category, issue, owner_id, actor_id)
+    
+    @staticmethod
+    async def delete_ticket(db: AsyncSession, ticket_id: int, owner_id: int = None, actor_id: int = None):
+        return await writer.submit(db, TicketWrites.delete_ticket, ticket_id, owner_id, actor_id)
+    
+    @staticmethod
+    async def get_ticket_stats(db: AsyncSession, owner_id: int = None):
+        criteria = [models.Ticket.owner_id == owner_id] if owner_id is not None else []
+        stats = await AsyncStatsService.get_ticket_stats(db, criteria)
         return {
-            "total": len(tickets),
-            "open": len([t for t in tickets if t.status == "Open"]),
-            "in_progress": len([t for t in tickets if t.status == "In Progress"]),
-            "closed": len([t for t in tickets if t.status == "Closed"])
-        }
\ No newline at end of file
+            "total": stats.total,
+            "open": stats.count(status="Open"),
+            "in_progress": stats.count(status="In Progress"),
+            "closed": stats.count(status="Closed")
+        }
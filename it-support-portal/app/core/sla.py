@@ -0,0 +1,111 @@
+import math
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import models
+
+# Time-to-close histogram buckets. Bucket 0 holds everything under
+# MIN_SECONDS; bucket b >= 1 covers [MIN_SECONDS * GROWTH ** (b - 1),
+# MIN_SECONDS * GROWTH ** b). Reading a percentile at the bucket's geometric
+# midpoint is then off by at most sqrt(GROWTH) - 1, about 10%.
+MIN_SECONDS = 60
+GROWTH = 1.2
+
+def bucket_for(seconds: float):
+    if seconds < MIN_SECONDS:
+        return 0
+    return 1 + int(math.log(seconds / MIN_SECONDS, GROWTH))
+
+def bucket_bounds(bucket: int):
+    if bucket == 0:
+        return 0.0, float(MIN_SECONDS)
+    return MIN_SECONDS * GROWTH ** (bucket - 1), MIN_SECONDS * GROWTH ** bucket
+
+def close_time_bucket(created_at, closed_at):
+    """The histogram bucket for a ticket, or None if it is not closed or
+    was closed at an unknown time."""
+    if created_at is None or closed_at is None:
+        return None
+    return bucket_for(max((closed_at - created_at).total_seconds(), 0))
+
+class CloseTimes:
+    """Time-to-close distribution of one group of closed tickets."""
+
+    def __init__(self, counts: dict = None):
+        # bucket -> tickets
+        self.counts = counts or {}
+
+    def merge(self, other: "CloseTimes"):
+        for bucket, tickets in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + tickets
+        return self
+
+    @property
+    def tickets(self):
+        return sum(self.counts.values())
+
+    def percentile(self, p: float):
+        """Seconds within which p% of these tickets were closed, or None."""
+        total = self.tickets
+        if not total:
+            return None
+        rank = p / 100 * total
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                low, high = bucket_bounds(bucket)
+                return high / 2 if bucket == 0 else math.sqrt(low * high)
+        return None
+
+    @property
+    def median(self):
+        return self.percentile(50)
+
+    @property
+    def p90(self):
+        return self.percentile(90)
+
+class SlaSummary:
+    def __init__(self, groups: dict):
+        # (priority, department) -> CloseTimes
+        self.groups = groups
+
+    def _grouped(self, key):
+        result = {}
+        for group, close_times in self.groups.items():
+            result.setdefault(key(group), CloseTimes()).merge(close_times)
+        return result
+
+    def by_priority(self):
+        return self._grouped(lambda group: group[0])
+
+    def by_department(self):
+        return self._grouped(lambda group: group[1])
+
+    def overall(self):
+        return self._grouped(lambda group: None).get(None, CloseTimes())
+
+def format_duration(seconds: float):
+    if seconds is None:
+        return "-"
+    if seconds < 60:
+        return "<1m"
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 48:
+        return f"{hours}h {minutes}m"
+    return f"{hours // 24}d {hours % 24}h"
+
+class AsyncSlaService:
+    @staticmethod
+    async def get_summary(db: AsyncSession):
+        """Time-to-close distributions of every ticket closed at a known time, hot or archived."""
+        table = models.CloseTimeBucket
+        rows = await db.execute(select(table.priority, table.department, table.bucket, table.tickets))
+        groups = {}
+        for priority, department, bucket, tickets in rows:
+            if tickets:
+                groups.setdefault((priority, department), CloseTimes()).counts[bucket] = tickets
+        return SlaSummary(groups)
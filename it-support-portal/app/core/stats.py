@@ -0,0 +1,87 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db import models
+
+STATUSES = ["Open", "In Progress", "Closed"]
+PRIORITIES = ["Low", "Medium", "High"]
+
+class TicketStats:
+    def __init__(self, rows):
+        # (status, priority, department) -> ticket count
+        self.counts = {}
+        for status, priority, department, count in rows:
+            key = (status, priority, department)
+            self.counts[key] = self.counts.get(key, 0) + count
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def count(self, status: str = None, priority: str = None, department: str = None):
+        return sum(
+            n for (s, p, d), n in self.counts.items()
+            if (status is None or s == status)
+            and (priority is None or p == priority)
+            and (department is None or d == department)
+        )
+
+    def by_status(self):
+        return self._group(0, STATUSES)
+
+    def by_priority(self):
+        return self._group(1, PRIORITIES)
+
+    def by_department(self):
+        return self._group(2, [])
+
+    def _group(self, position: int, known: list):
+        totals = {key: 0 for key in known}
+        for key, n in self.counts.items():
+            totals[key[position]] = totals.get(key[position], 0) + n
+        return totals
+
+    def summary(self):
+        return {
+            "total_tickets": self.total,
+            "open_tickets": self.count(status="Open"),
+            "in_progress_tickets": self.count(status="In Progress"),
+            "closed_tickets": self.count(status="Closed"),
+            "low_priority": self.count(priority="Low"),
+            "medium_priority": self.count(priority="Medium"),
+            "high_priority": self.count(priority="High")
+        }
+
+class StatsService:
+    @staticmethod
+    def statement(criteria=(), table=models.Ticket):
+        # One grouped pass over ix_tickets_status_priority_department instead of
+        # hydrating every Ticket and counting in Python.
+        return select(
+            table.status,
+            table.priority,
+            table.department,
+            func.count(table.id)
+        ).where(
+            *criteria
+        ).group_by(
+            table.status,
+            table.priority,
+            table.department
+        )
+
+    @staticmethod
+    def get_ticket_stats(db: Session, criteria=(), archive_criteria=None):
+        rows = db.execute(StatsService.statement(criteria)).all()
+        if archive_criteria is not None:
+            rows += db.execute(StatsService.statement(archive_criteria, models.TicketArchive)).all()
+        return TicketStats(rows)
+
+class AsyncStatsService:
+    @staticmethod
+    async def get_ticket_stats(db: AsyncSession, criteria=(), archive_criteria=None):
+        """Counts over the hot table, plus tickets_archive when ``archive_criteria`` is given."""
+        rows = (await db.execute(StatsService.statement(criteria))).all()
+        if archive_criteria is not None:
+            rows += (await db.execute(StatsService.statement(archive_criteria, models.TicketArchive))).all()
+        return TicketStats(rows)
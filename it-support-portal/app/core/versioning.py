@@ -0,0 +1,40 @@
+from datetime import datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import models
+
+# Names of the counters in data_versions. Each one is bumped inside the same
+# transaction as the write it covers, so a reader that sees a version also
+# sees every change made before it.
+TICKETS = "tickets"
+# Accounts and roles; every worker drops its cached principals when it changes.
+USERS = "users"
+VERSION_NAMES = (TICKETS, USERS)
+
+def bump_statement(name: str = TICKETS):
+    return (
+        update(models.DataVersion)
+        .where(models.DataVersion.name == name)
+        .values(version=models.DataVersion.version + 1, updated_at=datetime.utcnow())
+    )
+
+def seed_versions(conn):
+    existing = set(conn.execute(select(models.DataVersion.name)).scalars())
+    for name in VERSION_NAMES:
+        if name not in existing:
+            conn.execute(insert(models.DataVersion).values(name=name, version=0, updated_at=datetime.utcnow()))
+
+def bump(db, name: str = TICKETS):
+    """Sync variant for a Session or Connection that is already in a transaction."""
+    db.execute(bump_statement(name))
+
+async def bump_async(db: AsyncSession, name: str = TICKETS):
+    await db.execute(bump_statement(name))
+
+async def current_version(db: AsyncSession, name: str = TICKETS):
+    """Return (version, updated_at) for the named counter."""
+    result = await db.execute(
+        select(models.DataVersion.version, models.DataVersion.updated_at).where(models.DataVersion.name == name)
+    )
+    row = result.first()
+    return (row.version, row.updated_at) if row else (0, None)
@@ -0,0 +1,130 @@
+import asyncio
+import app.db.database as database
+from app.core.config import config
+
+class WriteQueue:
+    """Single writer per process that commits queued ticket writes in groups.
+
+    A write is submitted as ``fn(session, *args)``, which stages its changes
+    without committing. The writer task takes the first queued write, waits
+    up to ``max_delay`` seconds for more (at most ``max_batch`` in total),
+    runs them in one session and commits once, so a burst of submissions
+    costs one transaction and one fsync instead of one each, and handlers in
+    this process never compete for the SQLite write lock. Every caller awaits
+    the result of its own write.
+
+    If anything in a group fails, the group is rolled back and each write is
+    replayed in its own transaction, so a bad write only fails its own caller.
+    Until start() is called (scripts, or an app without its lifespan) writes
+    run and commit directly on the caller's session.
+    """
+
+    def __init__(self, session_factory, max_batch: int = 64, max_delay: float = 0.002, max_pending: int = 1024):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.batches = 0
+        self.operations = 0
+        self.replayed = 0
+        self._queue = None
+        self._task = None
+
+    @property
+    def pending(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        self._queue = asyncio.Queue(self.max_pending)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Commit everything already queued, then stop the writer."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        await self._queue.put(None)
+        await task
+        self._queue = None
+
+    async def submit(self, db, fn, *args):
+        if self._task is None:
+            result = await fn(db, *args)
+            await db.commit()
+            return result
+        future = asyncio.get_running_loop().create_future()
+        # A full queue makes callers wait here rather than piling up work.
+        await self._queue.put((fn, args, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stopping = self._drain(batch)
+            if not stopping and len(batch) < self.max_batch and self.max_delay > 0:
+                await asyncio.sleep(self.max_delay)
+                stopping = self._drain(batch)
+            try:
+                await self._commit(batch)
+            except Exception as e:
+                # Keep the writer alive whatever happens to one group.
+                for _, _, future in batch:
+                    _resolve(future, exception=e)
+            if stopping:
+                return
+
+    def _drain(self, batch: list):
+        """Move queued writes into ``batch``; True once the stop marker is reached."""
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return False
+            if item is None:
+                return True
+            batch.append(item)
+        return False
+
+    async def _commit(self, batch: list):
+        async with self.session_factory() as db:
+            try:
+                results = []
+                for fn, args, _ in batch:
+                    results.append(await fn(db, *args))
+                    # Later writes in the group see this one, e.g. its new id.
+                    await db.flush()
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                if len(batch) == 1:
+                    _resolve(batch[0][2], exception=e)
+                    return
+                results = None
+        if results is None:
+            self.replayed += len(batch)
+            for item in batch:
+                await self._commit([item])
+            return
+        self.batches += 1
+        self.operations += len(batch)
+        for (_, _, future), result in zip(batch, results):
+            _resolve(future, result)
+
+def _resolve(future, result=None, exception: Exception = None):
+    # The caller may have gone away (client disconnect) while it waited.
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+writer = WriteQueue(
+    database.AsyncSessionLocal,
+    max_batch=config.WRITE_BATCH_MAX_OPERATIONS,
+    max_delay=config.WRITE_BATCH_MAX_DELAY_MS / 1000,
+    max_pending=config.WRITE_QUEUE_MAX_PENDING
+)
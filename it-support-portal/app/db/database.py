@@ -1,9 +1,88 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from app.core.config import config
+from app.core import metrics
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./app/db/portal.db"
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql"
+}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Default (pool_size, max_overflow) per backend. SQLite has a single writer, so
+# a handful of connections is enough; server databases get a larger pool.
+POOL_SIZES = {
+    "sqlite": (5, 5),
+    "postgresql": (10, 20),
+    "mysql": (10, 20)
+}
+
+def to_async_url(url: str):
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}', set ASYNC_DATABASE_URL")
+    return str(parsed.set(drivername=ASYNC_DRIVERS[backend]))
+
+def is_sqlite(url: str):
+    return make_url(url).get_backend_name() == "sqlite"
+
+def engine_options(url: str, is_async: bool):
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    options = {"echo": config.DB_ECHO}
+
+    if backend == "sqlite":
+        if parsed.database in (None, "", ":memory:"):
+            # Every connection to :memory: is a new database, so share one.
+            options["poolclass"] = StaticPool
+            options["connect_args"] = {"check_same_thread": False}
+            return options
+        options["connect_args"] = {"check_same_thread": False, "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    else:
+        options["pool_pre_ping"] = True
+        options["pool_recycle"] = config.DB_POOL_RECYCLE
+
+    pool_size, max_overflow = POOL_SIZES.get(backend, (5, 10))
+    options["poolclass"] = AsyncAdaptedQueuePool if is_async else QueuePool
+    options["pool_size"] = config.DB_POOL_SIZE or pool_size
+    options["max_overflow"] = config.DB_MAX_OVERFLOW if config.DB_MAX_OVERFLOW is not None else max_overflow
+    options["pool_timeout"] = config.DB_POOL_TIMEOUT
+    return options
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+    # A negative cache_size is measured in KiB rather than pages.
+    cursor.execute(f"PRAGMA cache_size=-{int(config.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+ASYNC_SQLALCHEMY_DATABASE_URL = config.ASYNC_DATABASE_URL or to_async_url(SQLALCHEMY_DATABASE_URL)
+
+# The sync engine serves schema setup and scripts; request handlers use the
+# async engine so database I/O does not block the event loop.
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL, is_async=False))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **engine_options(ASYNC_SQLALCHEMY_DATABASE_URL, is_async=True))
+AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+if is_sqlite(SQLALCHEMY_DATABASE_URL):
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+if is_sqlite(ASYNC_SQLALCHEMY_DATABASE_URL):
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+
+metrics.instrument_engine(engine, "sync")
+metrics.instrument_engine(async_engine.sync_engine, "async")
+
+Base = declarative_base()
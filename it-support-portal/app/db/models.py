@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from datetime import datetime
 from app.db.database import Base
 
@@ -22,4 +22,108 @@ class Ticket(Base):
     issue = Column(String)
     status = Column(String)
     priority = Column(String)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    # Set when the status becomes Closed and cleared on reopening.
+    closed_at = Column(DateTime)
+    # The earlier open ticket this one looked like when it was filed. Not a
+    # foreign key, so the link survives the original being archived.
+    duplicate_of = Column(Integer)
+
+    __table_args__ = (
+        Index("ix_tickets_status_priority_department", "status", "priority", "department"),
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at", "status", "created_at"),
+        Index("ix_tickets_department_created_at", "department", "created_at"),
+        Index("ix_tickets_category_created_at", "category", "created_at"),
+        Index("ix_tickets_owner_id_status", "owner_id", "status"),
+        Index("ix_tickets_owner_id_created_at", "owner_id", "created_at"),
+        Index("ix_tickets_status_closed_at", "status", "closed_at"),
+        # Ids are never reused, so one can't name a hot and an archived ticket.
+        {"sqlite_autoincrement": True}
+    )
+
+class TicketArchive(Base):
+    """Tickets closed for longer than ARCHIVE_AFTER_DAYS, moved out of the hot
+    table by app.core.archive. Rows keep their ticket id and are read-only."""
+    __tablename__ = "tickets_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String)
+    email = Column(String)
+    department = Column(String)
+    category = Column(String)
+    issue = Column(String)
+    status = Column(String)
+    priority = Column(String)
+    created_at = Column(DateTime)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    closed_at = Column(DateTime)
+    duplicate_of = Column(Integer)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_tickets_archive_created_at_id", "created_at", "id"),
+        Index("ix_tickets_archive_owner_id_created_at", "owner_id", "created_at"),
+    )
+
+class HourlyTicketRollup(Base):
+    """Tickets opened and closed per hour (UTC), maintained by app.core.rollups."""
+    __tablename__ = "ticket_rollups_hourly"
+
+    bucket = Column(DateTime, primary_key=True)
+    # Missing values are stored as "" so they can be part of the key.
+    department = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    priority = Column(String, primary_key=True)
+    opened = Column(Integer, nullable=False, default=0)
+    closed = Column(Integer, nullable=False, default=0)
+
+class DailyTicketRollup(Base):
+    """Tickets opened and closed per day (UTC), maintained by app.core.rollups."""
+    __tablename__ = "ticket_rollups_daily"
+
+    bucket = Column(DateTime, primary_key=True)
+    department = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    priority = Column(String, primary_key=True)
+    opened = Column(Integer, nullable=False, default=0)
+    closed = Column(Integer, nullable=False, default=0)
+
+class CloseTimeBucket(Base):
+    """Closed tickets per time-to-close bucket (see app.core.sla), maintained
+    by app.core.rollups alongside the opened/closed counts."""
+    __tablename__ = "ticket_close_time_buckets"
+
+    priority = Column(String, primary_key=True)
+    department = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    tickets = Column(Integer, nullable=False, default=0)
+
+class TicketEvent(Base):
+    """Append-only history of ticket changes, one row per changed field,
+    written in the same transaction as the change. ticket_id and actor_id
+    are not foreign keys so the history outlives deleted tickets and users."""
+    __tablename__ = "ticket_events"
+
+    id = Column(Integer, primary_key=True)
+    ticket_id = Column(Integer, nullable=False)
+    occurred_at = Column(DateTime, nullable=False)
+    actor_id = Column(Integer)
+    # created, changed or deleted
+    kind = Column(String, nullable=False)
+    field = Column(String)
+    old_value = Column(String)
+    new_value = Column(String)
+
+    __table_args__ = (
+        Index("ix_ticket_events_ticket_id_occurred_at", "ticket_id", "occurred_at"),
+        Index("ix_ticket_events_occurred_at", "occurred_at"),
+    )
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
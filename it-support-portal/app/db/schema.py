@@ -0,0 +1,170 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateTable
+from app.db import models
+from app.core import rollups
+from app.core.versioning import seed_versions
+
+def init_db(engine):
+    existing = inspect(engine)
+    new_rollups = not all(existing.has_table(table.__tablename__)
+                          for table in (models.DailyTicketRollup, models.CloseTimeBucket))
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        repaired = migrate(conn)
+        seed_versions(conn)
+        if new_rollups or repaired:
+            # Databases from before the rollups or the close time histogram
+            # existed get them filled once, as do those whose close times
+            # migrate() just changed.
+            rollups.rebuild(conn)
+        if conn.dialect.name == "sqlite":
+            create_search_index(conn)
+            create_archive_search_index(conn)
+            protect_event_log(conn)
+    # create_all skips the indexes of tables that already exist, so add any
+    # index declared after the table was first created.
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def column_names(conn, table: str):
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+def migrate(conn):
+    # In-place upgrades for databases created before a column existed. Each
+    # step checks the live schema, so running it again is a no-op. Returns
+    # True if ticket close times changed and the rollups need a rebuild.
+    if "owner_id" not in column_names(conn, "tickets"):
+        conn.execute(text("ALTER TABLE tickets ADD COLUMN owner_id INTEGER REFERENCES users (id) ON DELETE SET NULL"))
+        backfill_ticket_owners(conn)
+    if "updated_at" not in column_names(conn, "data_versions"):
+        conn.execute(text("ALTER TABLE data_versions ADD COLUMN updated_at DATETIME"))
+    if "closed_at" not in column_names(conn, "tickets"):
+        # The real closing time was never recorded, so closed tickets from
+        # before this keep NULL: they count as closed but have no close time.
+        conn.execute(text("ALTER TABLE tickets ADD COLUMN closed_at DATETIME"))
+    # Earlier upgrades and imports stood in created_at for an unknown close
+    # time, which the close time histogram read as a zero-minute close.
+    repaired = 0
+    for table in ("tickets", "tickets_archive"):
+        repaired += conn.execute(text(
+            f"UPDATE {table} SET closed_at = NULL WHERE status = 'Closed' AND closed_at = created_at"
+        )).rowcount
+    for table in ("tickets", "tickets_archive"):
+        if "duplicate_of" not in column_names(conn, table):
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN duplicate_of INTEGER"))
+    if conn.dialect.name == "sqlite":
+        if not ticket_ids_autoincrement(conn):
+            rebuild_tickets_table(conn)
+        seed_ticket_ids(conn)
+    return repaired > 0
+
+def ticket_ids_autoincrement(conn):
+    sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tickets'")).scalar()
+    return "AUTOINCREMENT" in sql.upper()
+
+def rebuild_tickets_table(conn):
+    # SQLite only takes AUTOINCREMENT from CREATE TABLE, so copy the rows into
+    # a new table. Its indexes and search triggers are created again by
+    # init_db; the search index itself is untouched as the ids stay the same.
+    for kind, name in conn.execute(text(
+        "SELECT type, name FROM sqlite_master WHERE tbl_name = 'tickets' AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    )).all():
+        conn.execute(text(f"DROP {kind.upper()} {name}"))
+    conn.execute(text("ALTER TABLE tickets RENAME TO tickets_before_autoincrement"))
+    conn.execute(CreateTable(models.Ticket.__table__))
+    columns = ", ".join(column.name for column in models.Ticket.__table__.columns)
+    conn.execute(text(f"INSERT INTO tickets ({columns}) SELECT {columns} FROM tickets_before_autoincrement"))
+    conn.execute(text("DROP TABLE tickets_before_autoincrement"))
+
+def seed_ticket_ids(conn):
+    # New tickets must not take the id of an archived one, including after
+    # every hot ticket above it has been archived.
+    archived = conn.execute(text("SELECT MAX(id) FROM tickets_archive")).scalar()
+    if archived is None:
+        return
+    seq = conn.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'tickets'")).scalar()
+    if seq is None:
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('tickets', :seq)"), {"seq": archived})
+    elif seq < archived:
+        conn.execute(text("UPDATE sqlite_sequence SET seq = :seq WHERE name = 'tickets'"), {"seq": archived})
+
+def backfill_ticket_owners(conn):
+    # Tickets record the submitting account's email; older rows without one
+    # fall back to matching the free-text name against usernames.
+    conn.execute(text("""
+        UPDATE tickets SET owner_id = COALESCE(
+            (SELECT MIN(users.id) FROM users
+             WHERE tickets.email IS NOT NULL AND tickets.email != '' AND users.email = tickets.email),
+            (SELECT MIN(users.id) FROM users WHERE lower(users.username) = lower(tickets.name))
+        )
+        WHERE owner_id IS NULL
+    """))
+
+FTS_COLUMNS = "issue, name, department, category"
+
+def create_search_index(conn):
+    # External-content FTS5 table over tickets. Triggers keep it in step with
+    # every insert, update and delete in the same transaction as the write.
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'")).first()
+    conn.execute(text(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+            {FTS_COLUMNS}, content='tickets', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_ai AFTER INSERT ON tickets BEGIN
+            INSERT INTO tickets_fts (rowid, {FTS_COLUMNS})
+            VALUES (new.id, new.issue, new.name, new.department, new.category);
+        END
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_ad AFTER DELETE ON tickets BEGIN
+            INSERT INTO tickets_fts (tickets_fts, rowid, {FTS_COLUMNS})
+            VALUES ('delete', old.id, old.issue, old.name, old.department, old.category);
+        END
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON tickets BEGIN
+            INSERT INTO tickets_fts (tickets_fts, rowid, {FTS_COLUMNS})
+            VALUES ('delete', old.id, old.issue, old.name, old.department, old.category);
+            INSERT INTO tickets_fts (rowid, {FTS_COLUMNS})
+            VALUES (new.id, new.issue, new.name, new.department, new.category);
+        END
+    """))
+    if not exists:
+        conn.execute(text("INSERT INTO tickets_fts (tickets_fts) VALUES ('rebuild')"))
+
+def create_archive_search_index(conn):
+    # Archived rows are only ever inserted or deleted, so no update trigger.
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_archive_fts'")).first()
+    conn.execute(text(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tickets_archive_fts USING fts5(
+            {FTS_COLUMNS}, content='tickets_archive', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS tickets_archive_fts_ai AFTER INSERT ON tickets_archive BEGIN
+            INSERT INTO tickets_archive_fts (rowid, {FTS_COLUMNS})
+            VALUES (new.id, new.issue, new.name, new.department, new.category);
+        END
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS tickets_archive_fts_ad AFTER DELETE ON tickets_archive BEGIN
+            INSERT INTO tickets_archive_fts (tickets_archive_fts, rowid, {FTS_COLUMNS})
+            VALUES ('delete', old.id, old.issue, old.name, old.department, old.category);
+        END
+    """))
+    if not exists:
+        conn.execute(text("INSERT INTO tickets_archive_fts (tickets_archive_fts) VALUES ('rebuild')"))
+
+def protect_event_log(conn):
+    # ticket_events is append-only; refuse edits at the database level too.
+    for action in ("UPDATE", "DELETE"):
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS ticket_events_no_{action.lower()} BEFORE {action} ON ticket_events BEGIN
+                SELECT RAISE(ABORT, 'ticket_events is append-only');
+            END
+        """))
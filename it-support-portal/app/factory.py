@@ -0,0 +1,119 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    from brotli_asgi import BrotliMiddleware
+    BROTLI_ENABLED = True
+except ImportError:
+    BROTLI_ENABLED = False
+
+import app.db.database as database
+import app.db.schema as schema
+import app.core.assets as assets
+import app.core.auth as auth
+import app.core.auth_context as auth_context
+import app.core.metrics as metrics
+from app.core.archive import TicketArchiver, archive_periodically
+from app.core.write_queue import writer
+from app.core.config import config
+
+async def add_user_to_request(request: Request, call_next):
+    if request.url.path.startswith("/static/"):
+        context = auth_context.ANONYMOUS
+    else:
+        context = await auth_context.resolve(auth_context.request_token(request))
+    request.state.auth = context
+    request.state.user = context.username
+    request.state.user_permission = context.permission
+
+    response = await call_next(request)
+    return response
+
+async def record_request_metrics(request: Request, call_next):
+    # Registered after add_user_to_request, so it wraps it and the principal
+    # lookup counts towards the request. For streaming responses the time is
+    # measured to the start of the response.
+    stats = metrics.RequestStats()
+    token = metrics.current_request.set(stats)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, path, status)
+        metrics.REQUEST_STATEMENTS.observe(stats.statements, path)
+        metrics.REQUEST_DB_SECONDS.observe(stats.db_seconds, path)
+        metrics.current_request.reset(token)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The production launcher migrates once before forking and turns
+    # this off, so workers don't race each other through the DDL.
+    if config.INIT_DB_ON_STARTUP:
+        await run_in_threadpool(schema.init_db, database.engine)
+    archiver = None
+    if config.ARCHIVE_INTERVAL_SECONDS > 0:
+        archiver = asyncio.create_task(archive_periodically(
+            TicketArchiver(database.engine, config.ARCHIVE_AFTER_DAYS, config.ARCHIVE_BATCH_SIZE),
+            config.ARCHIVE_INTERVAL_SECONDS, config.ARCHIVE_BATCH_PAUSE_SECONDS
+        ))
+    if config.WRITE_QUEUE_ENABLED:
+        writer.start()
+    publisher = None
+    if config.METRICS_DIR:
+        from app.api.ui import metrics_snapshot
+        publisher = asyncio.create_task(metrics.publish_periodically(
+            metrics.SharedMetrics(config.METRICS_DIR), metrics_snapshot, config.METRICS_PUBLISH_SECONDS
+        ))
+    yield
+    if archiver is not None:
+        archiver.cancel()
+    # Requests still waiting on a queued write get their answer first.
+    await writer.stop()
+    if publisher is not None:
+        publisher.cancel()
+        await asyncio.gather(publisher, return_exceptions=True)
+    auth.hash_pool.shutdown()
+    await database.async_engine.dispose()
+    database.engine.dispose()
+
+def create_app():
+    """Build the ASGI application. Importing this module has no side effects
+    beyond creating the (lazily connecting) engines; the schema is set up in
+    the lifespan handler.
+
+    Everything is configured from the global ``config``: the engines, the
+    rate-limit store, the write queue and the event hub are module-level and
+    built from it at import, so settings must be in place (environment or
+    attributes on ``config``) before the app is created."""
+    # Deferred so the launcher's master process never loads the handlers.
+    import app.api.routes as routes
+    import app.api.v1 as v1
+
+    app = FastAPI(title=config.APP_NAME, version=config.VERSION, lifespan=lifespan)
+
+    # Brotli when the client accepts it, with gzip as the fallback. Streaming
+    # responses such as report downloads are compressed chunk by chunk.
+    if BROTLI_ENABLED:
+        app.add_middleware(BrotliMiddleware, quality=config.BROTLI_QUALITY,
+                           minimum_size=config.COMPRESSION_MINIMUM_SIZE, gzip_fallback=True)
+    else:
+        app.add_middleware(GZipMiddleware, minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+                           compresslevel=config.GZIP_COMPRESS_LEVEL)
+    app.middleware("http")(add_user_to_request)
+    app.middleware("http")(record_request_metrics)
+
+    # Built bundles under /static/dist are fingerprinted and cached for a
+    # year, with their .br/.gz variants served as is.
+    app.mount("/static", assets.AssetFiles(directory=config.STATIC_DIR), name="static")
+    app.include_router(routes.router)
+    app.include_router(v1.router)
+    return app
@@ -0,0 +1,172 @@
+"""Load benchmarks for the portal. Run from it-support-portal/:
+
+    python -m benchmarks seed --tickets 1000000 --reset
+    python -m benchmarks run --duration 60 --save-baseline   # once, on the reference machine
+    python -m benchmarks run --duration 60                   # exits 1 on a regression, 2 without a baseline
+    python -m benchmarks coldstart                           # process start to first response
+
+``run`` drives the app in-process by default; pass --url (and --server-pid
+for its peak memory) to measure a separately started server instead, which
+should be started with RATE_LIMIT_ENABLED=0. The in-process app runs its
+lifespan, so the write queue and the other background services are up as
+they are in production.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+DEFAULT_DATABASE = "sqlite:///./benchmarks/bench.db"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_OUTPUT = "benchmarks/results/latest.json"
+
+# app.core.config reads DATABASE_URL at import time, so app modules are only
+# imported once the command line has been parsed and the URL exported.
+
+def seed(args):
+    os.environ["DATABASE_URL"] = args.database
+    from benchmarks.seed import seed as run_seed
+    return run_seed(args)
+
+def run(args):
+    if not args.url:
+        os.environ["DATABASE_URL"] = args.database
+        # All virtual users share one client address, so the per-IP login
+        # limit would reject most of them.
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+        # Archiving would move tickets between runs and skew the comparison
+        # with the baseline; it is not part of the measured workload.
+        os.environ.setdefault("ARCHIVE_INTERVAL_SECONDS", "0")
+    import httpx
+    from benchmarks import report
+    from benchmarks.workload import drive
+
+    accounts = {"staff": args.staff, "it": args.it, "manager": args.managers}
+
+    def workload(make_client):
+        return drive(make_client, args.concurrency, args.duration, args.warmup, args.requests,
+                     accounts, args.tickets, args.seed)
+
+    if args.url:
+        def make_client():
+            return httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        target = args.url
+        measure = workload(make_client)
+    else:
+        import main
+        # ASGITransport sends no lifespan events, so start and stop the app's
+        # background services (write queue included) around the run here.
+        transport = httpx.ASGITransport(app=main.app)
+
+        def make_client():
+            return httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=args.timeout)
+        target = f"in-process ({args.database})"
+
+        async def in_process():
+            async with main.app.router.lifespan_context(main.app):
+                return await workload(make_client)
+        measure = in_process()
+
+    print(f"Running {args.concurrency} virtual users against {target}...", file=sys.stderr)
+    samples, seconds = asyncio.run(measure)
+    meta = {
+        "target": "url" if args.url else "in-process",
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "requests_per_user": args.requests,
+        "seed": args.seed
+    }
+    result = report.build(samples, seconds, meta, server_pid=args.server_pid)
+    report.save(result, args.output)
+    print(report.format_table(result))
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        report.save(result, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    return check(result, args.baseline, args.tolerance, args.allow_missing_baseline)
+
+def coldstart(args):
+    from benchmarks.coldstart import measure
+    results = measure(args.database, args.runs)
+    for name, timing in results.items():
+        print(f"{name:<15} median {timing['median_ms']:7.1f} ms   max {timing['max_ms']:7.1f} ms")
+    return 0
+
+def compare(args):
+    from benchmarks import report
+    result = report.load(args.result)
+    print(report.format_table(result))
+    return check(result, args.baseline, args.tolerance, args.allow_missing_baseline)
+
+def check(result: dict, baseline_path: str, tolerance: float, allow_missing: bool = False):
+    from benchmarks import report
+    if not os.path.exists(baseline_path):
+        # A gate that passes without anything to compare against never fails.
+        print(f"No baseline at {baseline_path}; run with --save-baseline on the reference machine to record one")
+        return 0 if allow_missing else 2
+    regressions = report.compare(result, report.load(baseline_path), tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS against {baseline_path} (tolerance {tolerance:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions against {baseline_path} (tolerance {tolerance:.0%})")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="IT Support Portal benchmarks (run from it-support-portal/)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("seed", help="Generate users and tickets in a benchmark database")
+    p.add_argument("--database", default=DEFAULT_DATABASE)
+    p.add_argument("--tickets", type=int, default=100_000)
+    p.add_argument("--staff", type=int, default=1000)
+    p.add_argument("--it", type=int, default=20)
+    p.add_argument("--managers", type=int, default=10)
+    p.add_argument("--days", type=int, default=730, help="spread created_at over this many days")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--batch-size", type=int, default=20_000)
+    p.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    p.add_argument("--quiet", action="store_true")
+    p.set_defaults(func=seed)
+
+    p = commands.add_parser("run", help="Drive a mixed workload and report latency percentiles")
+    p.add_argument("--database", default=DEFAULT_DATABASE, help="database for the in-process app")
+    p.add_argument("--url", help="benchmark a running server instead, e.g. http://127.0.0.1:8000")
+    p.add_argument("--server-pid", type=int, help="report peak memory of this server process")
+    p.add_argument("--concurrency", type=int, default=20)
+    p.add_argument("--duration", type=float, default=30, help="seconds to measure after warm-up")
+    p.add_argument("--warmup", type=float, default=5)
+    p.add_argument("--requests", type=int, default=0, help="fixed requests per virtual user instead of a duration")
+    p.add_argument("--timeout", type=float, default=60)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--staff", type=int, default=1000, help="seeded staff accounts to log in as")
+    p.add_argument("--it", type=int, default=20)
+    p.add_argument("--managers", type=int, default=10)
+    p.add_argument("--tickets", type=int, default=100_000, help="seeded ticket count, for picking ids to update")
+    p.add_argument("--output", default=DEFAULT_OUTPUT)
+    p.add_argument("--baseline", default=DEFAULT_BASELINE)
+    p.add_argument("--tolerance", type=float, default=0.25)
+    p.add_argument("--save-baseline", action="store_true")
+    p.add_argument("--allow-missing-baseline", action="store_true", help="exit 0 when there is no baseline to compare with")
+    p.set_defaults(func=run)
+
+    p = commands.add_parser("coldstart", help="Time imports and process start to first response")
+    p.add_argument("--database", default=DEFAULT_DATABASE)
+    p.add_argument("--runs", type=int, default=5)
+    p.set_defaults(func=coldstart)
+
+    p = commands.add_parser("compare", help="Check a saved result against the baseline")
+    p.add_argument("result")
+    p.add_argument("--baseline", default=DEFAULT_BASELINE)
+    p.add_argument("--tolerance", type=float, default=0.25)
+    p.add_argument("--allow-missing-baseline", action="store_true", help="exit 0 when there is no baseline to compare with")
+    p.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
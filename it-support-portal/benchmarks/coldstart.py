@@ -0,0 +1,54 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def time_command(args: list, env: dict):
+    started = time.perf_counter()
+    subprocess.run(args, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def time_to_first_response(env: dict, path: str, timeout: float):
+    """Start uvicorn on a free port and time until ``path`` answers 200."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    # One client for all polls: building one per attempt costs tens of ms.
+    client = httpx.Client(timeout=1)
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with status {server.returncode}")
+            try:
+                if client.get(url).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+        raise TimeoutError(f"no response from {url} within {timeout}s")
+    finally:
+        client.close()
+        server.terminate()
+        server.wait()
+
+def measure(database: str, runs: int, path: str = "/login", timeout: float = 30):
+    """Median and worst seconds for: bare interpreter, `import main`, and
+    process start to first successful response."""
+    env = dict(os.environ, DATABASE_URL=database)
+    interpreter = [time_command([sys.executable, "-c", "pass"], env) for _ in range(runs)]
+    imports = [time_command([sys.executable, "-c", "import main"], env) for _ in range(runs)]
+    first_response = [time_to_first_response(env, path, timeout) for _ in range(runs)]
+    return {
+        name: {"median_ms": statistics.median(values) * 1000, "max_ms": max(values) * 1000}
+        for name, values in (("interpreter", interpreter), ("import_main", imports), ("first_response", first_response))
+    }
@@ -0,0 +1,110 @@
+import json
+import math
+import os
+import platform
+import resource
+import sys
+from datetime import datetime
+
+def percentile(sorted_values: list, p: float):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarise(samples: list, seconds: float):
+    latencies = sorted(s.seconds for s in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s.ok),
+        "throughput": len(samples) / seconds if seconds else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "bytes": sum(s.size for s in samples)
+    }
+
+def max_rss_mb(pid: int = None):
+    """Peak resident memory of this process, or of ``pid`` via /proc on Linux."""
+    if pid is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and KiB elsewhere.
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+def build(samples: list, seconds: float, meta: dict, server_pid: int = None):
+    operations = {}
+    for sample in samples:
+        operations.setdefault(sample.operation, []).append(sample)
+    return {
+        "meta": {
+            **meta,
+            "started": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seconds": seconds
+        },
+        "total": summarise(samples, seconds),
+        "operations": {name: summarise(items, seconds) for name, items in sorted(operations.items())},
+        "memory": {
+            "client_max_rss_mb": max_rss_mb(),
+            "server_max_rss_mb": max_rss_mb(server_pid) if server_pid else None
+        }
+    }
+
+def format_table(result: dict):
+    lines = [f"{'operation':<14} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    rows = list(result["operations"].items()) + [("TOTAL", result["total"])]
+    for name, s in rows:
+        lines.append(f"{name:<14} {s['requests']:>9} {s['errors']:>7} {s['throughput']:>9.1f} "
+                     f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+    memory = result["memory"]
+    lines.append(f"peak RSS: client {memory['client_max_rss_mb']:.0f} MB"
+                 + (f", server {memory['server_max_rss_mb']:.0f} MB" if memory["server_max_rss_mb"] else ""))
+    return "\n".join(lines)
+
+def compare(result: dict, baseline: dict, tolerance: float):
+    """Return a list of human-readable regressions against ``baseline``.
+
+    An operation regresses when its p95 latency grows, or its throughput
+    falls, by more than ``tolerance`` (0.25 = 25%), or when it starts
+    failing requests it used to serve.
+    """
+    regressions = []
+    current = dict(result["operations"], TOTAL=result["total"])
+    expected = dict(baseline["operations"], TOTAL=baseline["total"])
+    for name, base in expected.items():
+        now = current.get(name)
+        if now is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        if base["p95_ms"] and now["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {now['p95_ms']:.1f} ms vs baseline {base['p95_ms']:.1f} ms")
+        if base["throughput"] and now["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: {now['throughput']:.1f} req/s vs baseline {base['throughput']:.1f} req/s")
+        if now["errors"] and not base["errors"]:
+            regressions.append(f"{name}: {now['errors']} errors, baseline had none")
+    base_rss = baseline["memory"].get("server_max_rss_mb") or baseline["memory"].get("client_max_rss_mb")
+    now_rss = result["memory"].get("server_max_rss_mb") or result["memory"].get("client_max_rss_mb")
+    if base_rss and now_rss and now_rss > base_rss * (1 + tolerance):
+        regressions.append(f"peak RSS {now_rss:.0f} MB vs baseline {base_rss:.0f} MB")
+    return regressions
+
+def load(path: str):
+    with open(path) as f:
+        return json.load(f)
+
+def save(result: dict, path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+        f.write("\n")
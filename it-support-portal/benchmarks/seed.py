@@ -0,0 +1,174 @@
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event, text
+import app.db.database as database
+import app.db.models as models
+import app.db.schema as schema
+from app.core import auth, rollups, versioning
+from app.core.stats import STATUSES, PRIORITIES
+
+# Every seeded account shares this password so the workload driver can log in.
+PASSWORD = "benchmark1"
+
+STAFF_PREFIX = "staff"
+IT_PREFIX = "it"
+MANAGER_PREFIX = "manager"
+
+DEPARTMENTS = (("Engineering", 30), ("Sales", 20), ("Operations", 15), ("Marketing", 12), ("Finance", 10), ("HR", 8), ("Other", 5))
+CATEGORIES = (("Software", 30), ("Hardware", 20), ("Access", 15), ("Network", 12), ("Email", 10), ("Printer", 8), ("Other", 5))
+# Older tickets are mostly closed; see ticket_status().
+PRIORITY_WEIGHTS = (30, 50, 20)
+
+FIRST_NAMES = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Jamie", "Riley", "Avery", "Quinn", "Drew", "Robin")
+LAST_NAMES = ("Smith", "Jones", "Brown", "Garcia", "Miller", "Davis", "Wilson", "Moore", "Clark", "Lewis", "Walker", "Hall")
+SUBJECTS = ("Laptop", "VPN", "Outlook", "Printer on floor 3", "Monitor", "Wi-Fi", "Shared drive", "Password", "Docking station",
+            "Teams", "CRM", "Phone", "Badge reader", "Keyboard", "Build server", "Payroll app")
+PROBLEMS = ("won't start", "keeps disconnecting", "is very slow", "shows an error on login", "stopped working after the update",
+            "needs to be replaced", "cannot be reached from home", "asks for my password repeatedly", "is missing",
+            "crashes when opening attachments", "needs access for a new starter", "prints blank pages")
+DETAILS = ("It started this morning.", "Colleagues nearby have the same problem.", "I already tried restarting.",
+           "This is blocking a customer deadline.", "It happens every few hours.", "Error code 0x80070005.", "")
+
+def username(prefix: str, index: int):
+    return f"{prefix}{index:05d}"
+
+def weighted(rng: random.Random, choices):
+    names, weights = zip(*choices)
+    return rng.choices(names, weights)[0]
+
+def ticket_status(rng: random.Random, age_days: float):
+    # Fresh tickets are mostly open; anything older than a month mostly closed.
+    if age_days < 2:
+        return rng.choices(STATUSES, (60, 30, 10))[0]
+    if age_days < 30:
+        return rng.choices(STATUSES, (25, 25, 50))[0]
+    return rng.choices(STATUSES, (3, 2, 95))[0]
+
+class Seeder:
+    """Generate a deterministic synthetic dataset for benchmarking.
+
+    Secondary indexes and the FTS index are dropped while tickets are
+    loaded and rebuilt once at the end by schema.init_db, which is several
+    times faster than maintaining them row by row. The rollups are rebuilt
+    the same way.
+    """
+
+    def __init__(self, engine, seed: int = 42, days: int = 730, batch_size: int = 20000, progress=None):
+        self.engine = engine
+        self.rng = random.Random(seed)
+        self.days = days
+        self.batch_size = batch_size
+        self.progress = progress
+
+    def reset(self):
+        if self.engine.dialect.name == "sqlite":
+            with self.engine.begin() as conn:
+                self._drop_search_index(conn)
+        models.Base.metadata.drop_all(bind=self.engine)
+        schema.init_db(self.engine)
+
+    def seed_users(self, staff: int, it: int, managers: int):
+        password = auth.get_password_hash(PASSWORD)
+        rows = []
+        for prefix, role, count in ((STAFF_PREFIX, "staff", staff), (IT_PREFIX, "it", it), (MANAGER_PREFIX, "manager", managers)):
+            for i in range(count):
+                name = username(prefix, i)
+                rows.append({"username": name, "email": f"{name}@example.com", "password": password, "role": role})
+        with self.engine.begin() as conn:
+            conn.execute(models.User.__table__.insert(), rows)
+            ids = conn.execute(
+                text("SELECT id, username, email FROM users WHERE username LIKE :p"), {"p": f"{STAFF_PREFIX}%"}
+            ).all()
+        return [(row.id, row.email) for row in ids]
+
+    def seed_tickets(self, count: int, owners: list):
+        if not owners:
+            raise ValueError("seed at least one staff user before tickets")
+        names = {owner_id: f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}" for owner_id, _ in owners}
+        now = datetime.utcnow()
+        table = models.Ticket.__table__
+        started = time.perf_counter()
+
+        with self.engine.begin() as conn:
+            self._drop_indexes(conn)
+
+        written = 0
+        while written < count:
+            batch = []
+            for _ in range(min(self.batch_size, count - written)):
+                # Volume grows over time: squaring a uniform draw skews towards recent days.
+                age_days = self.days * (1 - (1 - self.rng.random()) ** 2)
+                owner_id, email = self.rng.choice(owners)
+                detail = self.rng.choice(DETAILS)
+                created_at = now - timedelta(days=age_days)
+                status = ticket_status(self.rng, age_days)
+                closed_at = None
+                if status == "Closed":
+                    # Most tickets are resolved within a few days.
+                    closed_at = min(now, created_at + timedelta(hours=self.rng.expovariate(1 / 36)))
+                batch.append({
+                    "name": names[owner_id],
+                    "email": email,
+                    "department": weighted(self.rng, DEPARTMENTS),
+                    "category": weighted(self.rng, CATEGORIES),
+                    "issue": f"{self.rng.choice(SUBJECTS)} {self.rng.choice(PROBLEMS)}. {detail}".strip(),
+                    "status": status,
+                    "priority": self.rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+                    "created_at": created_at,
+                    "closed_at": closed_at,
+                    "owner_id": owner_id
+                })
+            with self.engine.begin() as conn:
+                conn.execute(table.insert(), batch)
+            written += len(batch)
+            if self.progress:
+                self.progress("tickets", written, count, time.perf_counter() - started)
+
+        if self.progress:
+            self.progress("indexes", 0, 0, time.perf_counter() - started)
+        # Recreates every dropped index and rebuilds tickets_fts from scratch.
+        schema.init_db(self.engine)
+        with self.engine.begin() as conn:
+            rollups.rebuild(conn)
+            versioning.bump(conn)
+        return time.perf_counter() - started
+
+    def _drop_indexes(self, conn):
+        for index in models.Ticket.__table__.indexes:
+            index.drop(bind=conn, checkfirst=True)
+        if conn.dialect.name == "sqlite":
+            self._drop_search_index(conn)
+
+    def _drop_search_index(self, conn):
+        for trigger in ("tickets_fts_ai", "tickets_fts_ad", "tickets_fts_au", "tickets_archive_fts_ai", "tickets_archive_fts_ad"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        conn.execute(text("DROP TABLE IF EXISTS tickets_fts"))
+        conn.execute(text("DROP TABLE IF EXISTS tickets_archive_fts"))
+
+def make_engine(url: str):
+    engine = create_engine(url, **database.engine_options(url, is_async=False))
+    if database.is_sqlite(url):
+        event.listen(engine, "connect", database.apply_sqlite_pragmas)
+    return engine
+
+def seed(args):
+    engine = make_engine(args.database)
+
+    def progress(stage, done, total, seconds):
+        if stage == "tickets":
+            print(f"\r{done:,}/{total:,} tickets, {done / seconds:,.0f}/s", end="", file=sys.stderr, flush=True)
+        else:
+            print(f"\nBuilding indexes...", file=sys.stderr, flush=True)
+
+    seeder = Seeder(engine, seed=args.seed, days=args.days, batch_size=args.batch_size, progress=None if args.quiet else progress)
+    if args.reset:
+        seeder.reset()
+    else:
+        schema.init_db(engine)
+    owners = seeder.seed_users(args.staff, args.it, args.managers)
+    seconds = seeder.seed_tickets(args.tickets, owners)
+    print(f"Seeded {args.staff + args.it + args.managers:,} users and {args.tickets:,} tickets in {seconds:.1f}s "
+          f"(password '{PASSWORD}')")
+    return 0
@@ -0,0 +1,134 @@
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+import httpx
+from benchmarks.seed import PASSWORD, STAFF_PREFIX, IT_PREFIX, MANAGER_PREFIX, DEPARTMENTS, CATEGORIES, username
+
+# Share of virtual users per role.
+ROLE_MIX = (("staff", 70), ("it", 20), ("manager", 10))
+
+# Form posts answer with a redirect; anything else should be a 200.
+EXPECTED_STATUS = {"login": 302, "log_ticket": 302, "it_update": 302}
+
+# Everyone logs in at once at the start, which can overrun the bcrypt pool
+# (503); retry with a short backoff rather than run the session logged out.
+LOGIN_ATTEMPTS = 5
+
+class Sample:
+    __slots__ = ("operation", "seconds", "ok", "size")
+
+    def __init__(self, operation: str, seconds: float, ok: bool, size: int):
+        self.operation = operation
+        self.seconds = seconds
+        self.ok = ok
+        self.size = size
+
+class VirtualUser:
+    """One logged-in client issuing a deterministic, weighted mix of requests."""
+
+    def __init__(self, client: httpx.AsyncClient, role: str, account: str, rng: random.Random, ticket_count: int):
+        self.client = client
+        self.role = role
+        self.account = account
+        self.rng = rng
+        self.ticket_count = ticket_count
+
+    def operations(self):
+        # (name, weight, coroutine function)
+        if self.role == "it":
+            return (("it_dashboard", 6, self.it_dashboard), ("it_filtered", 3, self.it_filtered), ("it_update", 1, self.it_update))
+        if self.role == "manager":
+            return (("manager", 8, self.manager), ("report_csv", 1, self.report_csv), ("login", 1, self.login))
+        return (("my_tickets", 6, self.my_tickets), ("log_ticket", 2, self.log_ticket), ("login", 1, self.login))
+
+    async def login(self):
+        return await self.client.post("/login", data={"username": self.account, "password": PASSWORD})
+
+    async def my_tickets(self):
+        return await self.client.get("/my-tickets")
+
+    async def log_ticket(self):
+        return await self.client.post("/log", data={
+            "name": self.account,
+            "department": self.rng.choice(DEPARTMENTS)[0],
+            "category": self.rng.choice(CATEGORIES)[0],
+            "issue": f"Benchmark ticket {self.rng.randrange(10**9)}"
+        })
+
+    async def it_dashboard(self):
+        return await self.client.get("/it")
+
+    async def it_filtered(self):
+        return await self.client.get("/it", params={"status": "Open", "department": self.rng.choice(DEPARTMENTS)[0]})
+
+    async def it_update(self):
+        return await self.client.post("/it", data={
+            "ticket_id": self.rng.randrange(1, self.ticket_count + 1),
+            "status": self.rng.choice(("Open", "In Progress")),
+            "priority": self.rng.choice(("Low", "Medium", "High"))
+        })
+
+    async def manager(self):
+        return await self.client.get("/manager")
+
+    async def report_csv(self):
+        since = date.today() - timedelta(days=7)
+        return await self.client.get("/manager/download-report", params={"format": "csv", "date_from": since.isoformat()})
+
+    async def run(self, samples: list, deadline: float, requests: int, warmup_until: float):
+        operations = self.operations()
+        weights = [op[1] for op in operations]
+        sent = 0
+        for attempt in range(LOGIN_ATTEMPTS):
+            if await self._timed("login", self.login, samples, warmup_until):
+                break
+            await asyncio.sleep(0.5 * (attempt + 1))
+        while (requests and sent < requests) or (not requests and time.perf_counter() < deadline):
+            name, _, call = self.rng.choices(operations, weights)[0]
+            await self._timed(name, call, samples, warmup_until)
+            sent += 1
+
+    async def _timed(self, name: str, call, samples: list, warmup_until: float):
+        started = time.perf_counter()
+        try:
+            response = await call()
+            ok = response.status_code == EXPECTED_STATUS.get(name, 200)
+            size = len(response.content)
+        except httpx.HTTPError:
+            ok, size = False, 0
+        if started >= warmup_until:
+            samples.append(Sample(name, time.perf_counter() - started, ok, size))
+        return ok
+
+def assign_roles(concurrency: int, accounts: dict, rng: random.Random):
+    """Pick (role, username) for each virtual user following ROLE_MIX."""
+    roles, weights = zip(*ROLE_MIX)
+    prefixes = {"staff": STAFF_PREFIX, "it": IT_PREFIX, "manager": MANAGER_PREFIX}
+    users = []
+    for i in range(concurrency):
+        role = roles[i % len(roles)] if i < len(roles) else rng.choices(roles, weights)[0]
+        users.append((role, username(prefixes[role], rng.randrange(accounts[role]))))
+    return users
+
+async def drive(make_client, concurrency: int, duration: float, warmup: float, requests: int, accounts: dict,
+                ticket_count: int, seed: int):
+    """Run the workload and return (samples, wall-clock seconds measured)."""
+    rng = random.Random(seed)
+    samples = []
+    started = time.perf_counter()
+    warmup_until = started + (0 if requests else warmup)
+    deadline = warmup_until + duration
+    clients = []
+    tasks = []
+    for i, (role, account) in enumerate(assign_roles(concurrency, accounts, rng)):
+        client = make_client()
+        clients.append(client)
+        user = VirtualUser(client, role, account, random.Random(seed * 1000 + i), ticket_count)
+        tasks.append(user.run(samples, deadline, requests, warmup_until))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for client in clients:
+            await client.aclose()
+    return samples, time.perf_counter() - max(warmup_until, started)